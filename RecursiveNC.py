@@ -1,10 +1,14 @@
 import os
-from src.grid import DIMENSION
-from src.game import Game
 
-os.chdir(os.path.dirname(__file__))
+# the game is only started when this file is run, so that the processes searching for
+# the computer's move (which import this file) never import pygame
+if __name__ == '__main__':
+    from src.grid import DIMENSION
+    from src.game import Game
 
-game = Game(DIMENSION)
-while game.running:
-    game.current_menu.display_menu()
-    game.play_game()
+    os.chdir(os.path.dirname(__file__))
+
+    game = Game(DIMENSION)
+    while game.running:
+        game.current_menu.display_menu()
+        game.play_game()
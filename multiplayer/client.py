@@ -1,16 +1,17 @@
 import os
 
-from src.game import Game
-from src.grid import DIMENSION
+if __name__ == '__main__':
+    from src.game import Game
+    from src.grid import DIMENSION
 
-os.chdir(os.path.dirname(__file__))
+    os.chdir(os.path.dirname(__file__))
 
-game = Game(DIMENSION)
-game.playing = True
-game.current_menu.run_display = False
-game.current_menu = game.multiplayer_menu
-game.current_menu.state = "Join"
-game.START_KEY = True
-while game.running:
-    game.current_menu.display_menu()
-    game.play_game()
+    game = Game(DIMENSION)
+    game.playing = True
+    game.current_menu.run_display = False
+    game.current_menu = game.multiplayer_menu
+    game.current_menu.state = "Join"
+    game.START_KEY = True
+    while game.running:
+        game.current_menu.display_menu()
+        game.play_game()
@@ -0,0 +1,260 @@
+"""
+Measures how long the game takes to start, and to make the first move of an online game
+"""
+
+__all__ = ["run_benchmark", "compare", "METRICS"]
+
+import os
+import sys
+import json
+import time
+import runpy
+import socket
+import platform
+import statistics
+import subprocess
+from typing import Optional, Dict, List, Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = {
+    "menu": os.path.join(ROOT, "RecursiveNC.py"),
+    "host": os.path.join(ROOT, "multiplayer", "server.py"),
+    "join": os.path.join(ROOT, "multiplayer", "client.py"),
+}
+# what each measurement times, in seconds
+METRICS = {
+    "launch": "from starting the process to running the first line of Python",
+    "import": "importing src.game, and with it pygame and the rest of the game",
+    "game_init": "Game.__init__",
+    "first_frame": "from the end of Game.__init__ to the first MainMenu frame reaching the window",
+    "host_accept_to_first_move": "from the host accepting a connection to sending its first move",
+    "join_to_first_move": "from the client joining to receiving and applying the host's first move",
+}
+FIRST_MOVE = 40  # the middle cell of the middle sub-board, which the host plays
+TIMEOUT = 60.0  # the number of seconds to wait for a process to report before giving up
+
+
+def _record(path: str, name: str, value: float, /):
+    with open(path, "a") as file:
+        file.write(json.dumps({"name": name, "value": value}) + "\n")
+
+
+def probe(role: str, path: str, launched: float, /):
+    """
+    Runs the script of role ("menu", "host" or "join") in this process with hooks which append
+    measurements to path as lines of JSON. The process exits once it has measured everything.
+    """
+    _record(path, "launch", time.time() - launched)
+    began = time.perf_counter()
+    import pygame
+    from src.board import cell_coordinates
+    from src.dirty import DirtyRects
+    from src.game import Game
+    from src.grid import DIMENSION, INNER_DIMENSION
+    from src.network import Listener
+    _record(path, "import", time.perf_counter() - began)
+    times: Dict[str, float] = {}
+
+    def finish(name: str, value: float, /):
+        _record(path, name, value)
+        os._exit(0)  # the game's loops would otherwise carry on waiting for input
+
+    def wrap(owner, name: str, wrapper: Callable[[Callable], Callable], /):
+        setattr(owner, name, wrapper(getattr(owner, name)))
+
+    def timed_init(init):
+        def __init__(self, *args, **kwargs):
+            began = time.perf_counter()
+            init(self, *args, **kwargs)
+            times["initialised"] = time.perf_counter()
+            _record(path, "game_init", times["initialised"] - began)
+        return __init__
+
+    def first_flush(flush):
+        def wrapped(self, *args):
+            changed = flush(self, *args)
+            if role == "menu" and "initialised" in times:
+                finish("first_frame", time.perf_counter() - times["initialised"])
+            return changed
+        return wrapped
+
+    wrap(Game, "__init__", timed_init)
+    wrap(DirtyRects, "flush", first_flush)
+    pygame.mouse.set_cursor = lambda *args, **kwargs: None  # not supported by the dummy video driver
+    if role == "host":
+        large_y, large_x, small_y, small_x = cell_coordinates(FIRST_MOVE)
+        position = (int((large_x * 3 + small_x + 0.5) * INNER_DIMENSION),
+                    int((large_y * 3 + small_y + 0.5) * INNER_DIMENSION + DIMENSION / 2))
+        pygame.mouse.get_pos = lambda: position
+        pygame.mouse.get_pressed = lambda *args, **kwargs: (True, False, False)
+
+        def clicked_on_connection(accept):
+            def wrapped(self):
+                if (session := accept(self)) is not None and "accepted" not in times:
+                    times["accepted"] = time.perf_counter()
+                    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=position))
+                return session
+            return wrapped
+
+        def timed_send(send):
+            def wrapped(self, state, *args):
+                message = send(self, state, *args)
+                if state.history:
+                    _record(path, "host_accept_to_first_move", time.perf_counter() - times["accepted"])
+                return message
+            return wrapped
+
+        def ready_on_listen(listen):
+            def wrapped(self, *args):
+                listen(self, *args)
+                _record(path, "listening", 0.0)
+            return wrapped
+
+        wrap(Listener, "accept", clicked_on_connection)
+        wrap(Game, "send_move", timed_send)
+        wrap(socket.socket, "listen", ready_on_listen)
+    elif role == "join":
+        def timed_join(join):
+            def wrapped(self):
+                times["joined"] = time.perf_counter()
+                return join(self)
+            return wrapped
+
+        def timed_receive(receive):
+            def wrapped(self, *args):
+                message = receive(self, *args)
+                finish("join_to_first_move", time.perf_counter() - times["joined"])
+                return message
+            return wrapped
+
+        wrap(Game, "client_multiplayer", timed_join)
+        wrap(Game, "receive_move", timed_receive)
+    runpy.run_path(SCRIPTS[role], run_name="__main__")
+
+
+def _launch(role: str, path: str, /) -> subprocess.Popen:
+    """
+    Starts a probe. Its home, config and cache directories are in the directory of path rather than
+    the user's, so that their settings cannot change the measurements and the benchmark leaves nothing behind.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    home = os.path.join(os.path.dirname(path), "home")
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1",
+                       HOME=home, USERPROFILE=home, XDG_CONFIG_HOME=os.path.join(home, ".config"),
+                       XDG_CACHE_HOME=os.path.join(home, ".cache"), APPDATA=os.path.join(home, "AppData", "Roaming"),
+                       LOCALAPPDATA=os.path.join(home, "AppData", "Local"))
+    return subprocess.Popen([sys.executable, "-m", "src.benchmark", "--probe", role, path, repr(time.time())],
+                            cwd=ROOT, env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _wait_for(path: str, names: List[str], process: subprocess.Popen, /) -> Dict[str, float]:
+    """Waits until the probe writing to path has measured every one of names, and returns its measurements."""
+    deadline = time.perf_counter() + TIMEOUT
+    while True:
+        results = {}
+        if os.path.exists(path):
+            with open(path) as file:
+                for line in file:
+                    if line.endswith("\n"):
+                        record = json.loads(line)
+                        results[record["name"]] = record["value"]
+        if all(name in results for name in names):
+            return results
+        if process.poll() is not None and process.returncode != 0:
+            raise RuntimeError(f"{process.args[4]} exited with code {process.returncode}")
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{process.args[4]} did not measure {', '.join(sorted(set(names) - set(results)))}")
+        time.sleep(0.01)
+
+
+def _measure_once(directory: str, /) -> Dict[str, float]:
+    """Starts the game once, then hosts and joins an online game once, and returns every measurement."""
+    measured: Dict[str, float] = {}
+    menu = _launch("menu", menu_path := os.path.join(directory, "menu.jsonl"))
+    try:
+        measured.update(_wait_for(menu_path, ["launch", "import", "game_init", "first_frame"], menu))
+    finally:
+        menu.kill()
+        menu.wait()
+    host = _launch("host", host_path := os.path.join(directory, "host.jsonl"))
+    join = None
+    try:
+        _wait_for(host_path, ["listening"], host)
+        join = _launch("join", join_path := os.path.join(directory, "join.jsonl"))
+        measured.update(join_to_first_move=_wait_for(join_path, ["join_to_first_move"], join)["join_to_first_move"])
+        measured.update(host_accept_to_first_move=_wait_for(host_path, ["host_accept_to_first_move"], host)
+                        ["host_accept_to_first_move"])
+    finally:
+        for process in (join, host):  # the client closes first, so the port can be hosted on again straight away
+            if process is not None:
+                process.kill()
+                process.wait()
+    return measured
+
+
+def run_benchmark(runs: int = 5, directory: Optional[str] = None) -> dict:
+    """
+    Measures everything in METRICS runs times, in fresh processes under the dummy video driver,
+    and returns the median, minimum and maximum of each in seconds, along with the environment.
+    The probes start with the default settings and their own caches, which an uncounted first run fills.
+    """
+    import tempfile
+    samples: Dict[str, List[float]] = {name: [] for name in METRICS}
+    with tempfile.TemporaryDirectory(dir=directory) as temporary:
+        _measure_once(temporary)
+        for _ in range(runs):
+            for name, value in _measure_once(temporary).items():
+                samples[name].append(value)
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+        "metrics": {name: {"median": statistics.median(values), "min": min(values), "max": max(values)}
+                    for name, values in samples.items()},
+    }
+
+
+def compare(results: dict, baseline: dict, /) -> Dict[str, float]:
+    """Returns how many times longer each metric took in results than in baseline (below 1 is faster)."""
+    return {name: result["median"] / before["median"] for name, result in results["metrics"].items()
+            if (before := baseline["metrics"].get(name)) and before["median"] > 0}
+
+
+def main(arguments: List[str], /):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m src.benchmark", description=__doc__.strip())
+    parser.add_argument("--runs", type=int, default=5, help="the number of times to measure everything")
+    parser.add_argument("--output", default="startup-benchmark.json", help="the file to write the results to")
+    parser.add_argument("--baseline", default="startup-baseline.json",
+                        help="the results to compare against, which are written first if the file does not exist")
+    parser.add_argument("--update-baseline", action="store_true", help="replace the baseline with these results")
+    options = parser.parse_args(arguments)
+    results = run_benchmark(options.runs)
+    baseline = None
+    if os.path.exists(options.baseline) and not options.update_baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+        results["baseline"] = {"file": options.baseline, "created": baseline.get("created"),
+                               "ratio": compare(results, baseline)}
+    with open(options.output, "w") as file:
+        json.dump(results, file, indent=2)
+    if baseline is None:
+        with open(options.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+    for name, metric in results["metrics"].items():
+        line = f"{name:>26}: {metric['median'] * 1000:8.1f}ms (min {metric['min'] * 1000:.1f}ms, " \
+               f"max {metric['max'] * 1000:.1f}ms)"
+        if baseline is not None and (ratio := results["baseline"]["ratio"].get(name)) is not None:
+            line += f", {ratio:.2f}x baseline"
+        print(line)
+    print(f"Results written to {options.output}" +
+          ("" if baseline is not None else f", and saved as the baseline in {options.baseline}"))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 5 and sys.argv[1] == "--probe":
+        probe(sys.argv[2], sys.argv[3], float(sys.argv[4]))
+    else:
+        main(sys.argv[1:])
@@ -0,0 +1,192 @@
+"""
+Compact bitboard representation of a game
+"""
+
+__all__ = ["Board", "PLAYERS", "WIN_COMBINATIONS", "LINE_MASKS", "FULL_MASK", "META",
+           "SUB_WON", "SUB_DRAWN", "GAME_WON", "GAME_DRAWN", "cell_index", "cell_coordinates"]
+
+from typing import Optional, Tuple
+from src.tables import FULL_MASK, WIN_COMBINATIONS, LINE_MASKS, POWERS, STATUS, TRANSITIONS, NO_TRANSITION
+
+PLAYERS = ('X', 'O')
+META = 9  # the board of sub-board winners is stored after the nine sub-boards
+
+# flags returned by Board.place, describing what a move completed
+SUB_WON, SUB_DRAWN, GAME_WON, GAME_DRAWN = 1, 2, 4, 8
+
+
+def cell_index(large_y: int, large_x: int, small_y: int, small_x: int, /) -> int:
+    """Returns the bit index (0-80) of a cell. Each sub-board occupies nine consecutive bits."""
+    return (large_y * 3 + large_x) * 9 + small_y * 3 + small_x
+
+
+def cell_coordinates(cell: int, /) -> Tuple[int, int, int, int]:
+    """Returns (large_y, large_x, small_y, small_x) of a bit index. The inverse of cell_index."""
+    sub, inner = divmod(cell, 9)
+    return sub // 3, sub % 3, inner // 3, inner % 3
+
+
+class Board:
+    """
+    Stores a whole game in a handful of integers.
+    Wins are detected with the tables of src.tables: every move looks up the new encoding of its
+    sub-board, and the status of that encoding says whether the move completed a line.
+    The board of sub-board winners is encoded and looked up the same way.
+
+    Attributes
+    ----------
+    cells : list[int]
+        one 81-bit bitboard per player (indexed like PLAYERS), see cell_index
+    won : list[int]
+        one 9-bit mask per player of the sub-boards that player has won
+    full : int
+        9-bit mask of the sub-boards with no empty cells
+    winner : int | None
+        the index in PLAYERS of the winner of the game
+    codes : list[int]
+        the encoding (see src.tables) of each sub-board, followed by that of the board of sub-board winners
+    filled : bytearray
+        the number of occupied cells of each sub-board, followed by the number of played sub-boards
+    """
+
+    __slots__ = "cells", "won", "full", "winner", "codes", "filled"
+
+    def __init__(self):
+        self.cells = [0, 0]
+        self.won = [0, 0]
+        self.full = 0
+        self.winner: Optional[int] = None
+        self.codes = [0] * 10
+        self.filled = bytearray(10)
+
+    def __repr__(self):
+        return f"Board(cells={self.cells}, won={self.won}, full={self.full}, winner={self.winner})"
+
+    def get(self, cell: int, /) -> Optional[str]:
+        """Returns the player occupying a cell, or None if it is empty."""
+        bit = 1 << cell
+        if self.cells[0] & bit:
+            return PLAYERS[0]
+        if self.cells[1] & bit:
+            return PLAYERS[1]
+        return None
+
+    def place(self, cell: int, player: int, /) -> int:
+        """
+        Places the mark of player (0 or 1) on an empty cell.
+        Returns a combination of the SUB_WON, SUB_DRAWN, GAME_WON and GAME_DRAWN flags.
+        Raises ValueError, leaving the board untouched, if the cell is occupied.
+        """
+        sub, inner = divmod(cell, 9)
+        codes, flags = self.codes, 0
+        if (code := TRANSITIONS[(codes[sub] * 2 + player) * 9 + inner]) == NO_TRANSITION:
+            raise ValueError(f"cell {cell} is already occupied")
+        self.cells[player] |= 1 << cell
+        was_played = self.played() >> sub & 1
+        codes[sub] = code
+        self.filled[sub] += 1
+        if not was_played:
+            if STATUS[code] == player:
+                flags = SUB_WON
+                self.won[player] |= 1 << sub
+            elif self.filled[sub] == 9:
+                flags = SUB_DRAWN
+        if self.filled[sub] == 9:
+            self.full |= 1 << sub
+        if flags:
+            self.filled[META] += 1
+            if flags == SUB_WON:
+                codes[META] = code = TRANSITIONS[(codes[META] * 2 + player) * 9 + sub]
+                if STATUS[code] == player and self.winner is None:
+                    self.winner = player
+                    flags |= GAME_WON
+            if self.filled[META] == 9 and self.winner is None:
+                flags |= GAME_DRAWN
+        return flags
+
+    def unplace(self, cell: int, player: int, flags: int, /):
+        """
+        Takes back the last move, given the flags that Board.place returned for it.
+        Nothing has to be searched for, since the flags say exactly which results to reverse.
+        """
+        self.cells[player] &= ~(1 << cell)
+        sub, inner = divmod(cell, 9)
+        self.codes[sub] -= (player + 1) * POWERS[inner]
+        self.filled[sub] -= 1
+        self.full &= ~(1 << sub)
+        if flags & SUB_WON:
+            self.won[player] &= ~(1 << sub)
+            self.codes[META] -= (player + 1) * POWERS[sub]
+            if flags & GAME_WON:
+                self.winner = None
+        if flags & (SUB_WON | SUB_DRAWN):
+            self.filled[META] -= 1
+
+    def remove(self, cell: int, /):
+        """Empties a cell, reversing everything that placing its mark completed."""
+        if (value := self.get(cell)) is None:
+            return
+        player = PLAYERS.index(value)
+        self.cells[player] &= ~(1 << cell)
+        sub, inner = divmod(cell, 9)
+        self.codes[sub] -= (player + 1) * POWERS[inner]
+        self.filled[sub] -= 1
+        was_played = self.played() >> sub & 1
+        self.full &= ~(1 << sub)
+        if self.won[player] >> sub & 1 and STATUS[self.codes[sub]] != player:
+            self.won[player] &= ~(1 << sub)
+            self.codes[META] -= (player + 1) * POWERS[sub]
+            if self.winner == player and STATUS[self.codes[META]] != player:
+                self.winner = None
+        if was_played and not self.played() >> sub & 1:
+            self.filled[META] -= 1
+
+    def copy(self) -> "Board":
+        """Returns an independent copy of the board."""
+        board = Board.__new__(Board)
+        board.restore(self.snapshot())
+        return board
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo: dict):
+        return self.copy()
+
+    def snapshot(self) -> tuple:
+        """Returns the whole state of the board as a tuple of integers and bytes, to be passed to restore."""
+        return (self.cells[0], self.cells[1], self.won[0], self.won[1], self.full, self.winner,
+                tuple(self.codes), bytes(self.filled))
+
+    def restore(self, snapshot: tuple, /):
+        """Returns the board to the state it was in when snapshot was taken."""
+        x_cells, o_cells, x_won, o_won, self.full, self.winner, codes, filled = snapshot
+        self.cells, self.won = [x_cells, o_cells], [x_won, o_won]
+        self.codes, self.filled = list(codes), bytearray(filled)
+
+    def occupied(self) -> int:
+        """Returns the bitboard of all occupied cells."""
+        return self.cells[0] | self.cells[1]
+
+    def sub_cells(self, sub: int, player: int, /) -> int:
+        """Returns the 9-bit mask of the cells player occupies in a sub-board."""
+        return (self.cells[player] >> (sub * 9)) & FULL_MASK
+
+    def played(self) -> int:
+        """Returns the 9-bit mask of the sub-boards that have been won or drawn."""
+        return self.won[0] | self.won[1] | self.full
+
+    def status(self, sub: int, /) -> int:
+        """Returns the status in STATUS of a sub-board (0-8), or of the board of sub-board winners (META)."""
+        return STATUS[self.codes[sub]]
+
+    def drawn(self) -> bool:
+        """Returns whether every sub-board has been played without either player winning the game."""
+        return self.winner is None and self.filled[META] == 9
+
+    @staticmethod
+    def winning_line(mask: int, /) -> Optional[int]:
+        """Returns the index in WIN_COMBINATIONS of a line completed in a 9-bit mask, if there is one."""
+        for line, line_mask in enumerate(LINE_MASKS):
+            if mask & line_mask == line_mask:
+                return line
+        return None
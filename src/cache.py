@@ -0,0 +1,152 @@
+"""
+Files the game keeps between runs: those it generates for itself in the user's cache directory,
+and the user's settings in their config directory
+"""
+
+__all__ = ["cache_directory", "config_directory", "read_cache", "write_cache", "write_atomic", "FileCache"]
+
+import hashlib
+import os
+import sys
+import tempfile
+from typing import Optional
+
+APP_NAME = "RecursiveNC"
+
+
+def cache_directory() -> str:
+    """Returns the directory to cache files in, following the conventions of the platform."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Local"))
+    elif sys.platform == "darwin":
+        base = os.path.expanduser(os.path.join("~", "Library", "Caches"))
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache"))
+    return os.path.join(base, APP_NAME)
+
+
+def config_directory() -> str:
+    """Returns the directory to keep the user's settings in, following the conventions of the platform."""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Roaming"))
+    elif sys.platform == "darwin":
+        base = os.path.expanduser(os.path.join("~", "Library", "Application Support"))
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser(os.path.join("~", ".config"))
+    return os.path.join(base, APP_NAME)
+
+
+def read_cache(name: str, /) -> Optional[bytes]:
+    """Returns the contents of a cached file, or None if it has not been cached or cannot be read."""
+    try:
+        with open(os.path.join(cache_directory(), name), "rb") as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def write_cache(name: str, data: bytes, /) -> bool:
+    """Caches a file and returns whether it could be written. The name may include subdirectories."""
+    return write_atomic(os.path.join(cache_directory(), name), data)
+
+
+def write_atomic(path: str, data: bytes, /) -> bool:
+    """
+    Writes a file, creating its directory, and returns whether it could be written.
+    The file is written beside its destination and then renamed over it, so other processes
+    reading it never see half a file.
+    """
+    directory, base = os.path.split(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=base, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+    except OSError:
+        return False
+    return True
+
+
+class FileCache:
+    """
+    A subdirectory of the cache holding files named by a hash of whatever they were generated from,
+    so a file never has to be invalidated: changing the inputs changes the name.
+    Reading a file marks it as recently used, and writing one removes the least recently used files
+    beyond max_entries. Several processes can share the directory, since files are only ever
+    replaced atomically and files which vanish while being evicted are ignored.
+
+    Attributes
+    ----------
+    name : str
+        the subdirectory of the cache directory
+    max_entries : int
+        the number of files kept
+    hits : int
+        the number of files found in the cache
+    misses : int
+        the number of files not found in the cache
+    """
+
+    __slots__ = "name", "max_entries", "hits", "misses"
+
+    def __init__(self, name: str, max_entries: int = 32):
+        self.name = name
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(*parts: bytes) -> str:
+        """Returns the name of the file generated from the given inputs."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(len(part).to_bytes(8, "little"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    @property
+    def directory(self) -> str:
+        return os.path.join(cache_directory(), self.name)
+
+    def get(self, key: str, /) -> Optional[bytes]:
+        """Returns the contents of a cached file, or None if it is not cached."""
+        if (data := read_cache(os.path.join(self.name, key))) is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(os.path.join(self.directory, key))
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes, /) -> bool:
+        """Caches a file, evicting the least recently used ones, and returns whether it could be written."""
+        if not write_cache(os.path.join(self.name, key), data):
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """Removes the least recently used files beyond max_entries."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as iterator:
+                for entry in iterator:
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except OSError:
+                            continue
+        except OSError:
+            return
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries:]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
@@ -0,0 +1,268 @@
+"""
+Computer opponents which play on a GameState and never touch pygame
+"""
+
+__all__ = ["ComputerAI", "random_playout"]
+
+import os
+import sys
+import math
+import random
+import time
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Tuple
+from src.board import PLAYERS, LINE_MASKS, FULL_MASK
+from src.state import GameState, ONGOING, DRAWN
+
+# the set bits of every 9-bit mask, how many there are, and whether a mask contains a complete line
+_BITS = tuple(tuple(bit for bit in range(9) if mask >> bit & 1) for mask in range(512))
+_COUNTS = tuple(len(bits) for bits in _BITS)
+_WINNING = tuple(any(mask & line == line for line in LINE_MASKS) for mask in range(512))
+
+
+def random_playout(state: GameState, rng: random.Random, /) -> int:
+    """
+    Plays random moves from a position until the game is over and returns its status.
+    The state is left untouched: the playout splits its board into small per sub-board integers.
+    The empty cells of a sub-board are cleared once it is won or drawn, so that a move anywhere
+    is one random number: a sub-board is chosen in proportion to its number of empty cells.
+    """
+    board = state.board
+    if (status := state.status()) != ONGOING:
+        return status
+    own = [[board.sub_cells(sub, player) for sub in range(9)] for player in range(2)]
+    played = board.played()
+    empty = [0 if played >> sub & 1 else ~(x | o) & FULL_MASK for sub, (x, o) in enumerate(zip(*own))]
+    won = list(board.won)
+    player, sub = state.to_move, state.target
+    uniform = rng.random
+    while True:
+        if sub is None:
+            counts = [_COUNTS[cells] for cells in empty]
+            choice, sub = int(uniform() * sum(counts)), 0
+            while choice >= counts[sub]:
+                choice -= counts[sub]
+                sub += 1
+            inner = _BITS[empty[sub]][choice]
+        else:
+            bits = _BITS[empty[sub]]
+            inner = bits[int(uniform() * len(bits))]
+        mine = own[player]
+        mine[sub] = cells = mine[sub] | 1 << inner
+        if _WINNING[cells]:
+            empty[sub] = 0
+            won[player] |= 1 << sub
+            if _WINNING[won[player]]:
+                return player
+        else:
+            empty[sub] ^= 1 << inner
+        if not empty[sub]:
+            if not any(empty):
+                return DRAWN
+            sub = None
+        else:
+            sub = inner if empty[inner] else None
+        player ^= 1
+
+
+class _Node:
+
+    __slots__ = "move", "parent", "children", "untried", "visits", "wins", "player"
+
+    def __init__(self, move: Optional[int], parent: Optional["_Node"], untried: List[int], player: int):
+        self.move = move
+        self.parent = parent
+        self.children: List[_Node] = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0  # from the point of view of player, who made move
+        self.player = player
+
+    def select(self, exploration: float) -> "_Node":
+        """Returns the child with the highest upper confidence bound (UCT)."""
+        # wins / visits + exploration * sqrt(log(parent visits) / visits), over a single division
+        scale, sqrt = exploration * math.sqrt(math.log(self.visits)), math.sqrt
+        best, highest = self.children[0], -1.0
+        for child in self.children:
+            if (bound := (child.wins + scale * sqrt(child.visits)) / child.visits) > highest:
+                best, highest = child, bound
+        return best
+
+
+def _search_worker(snapshot: tuple, deadline: Optional[float], playout_limit: Optional[int],
+                   exploration: float, seed: int) -> Tuple[Dict[int, int], int]:
+    """
+    Grows an independent search tree in a worker process until deadline (a time.perf_counter value,
+    which is shared between processes). Returns the visits of each move at the root and the number of playouts made.
+    """
+    state = GameState()
+    state.restore(snapshot)
+    computer = ComputerAI(exploration=exploration, seed=seed)
+    root = computer.search(state, state.legal_moves(), deadline, playout_limit)
+    return {child.move: child.visits for child in root.children}, computer.playouts
+
+
+def _ready() -> int:
+    """Does nothing in a worker process, which imports the rules engine in it."""
+    return os.getpid()
+
+
+class ComputerAI:
+    """
+    A Monte-Carlo Tree Search (UCT) player. Each move gets a budget of time and/or playouts.
+    With more than one worker, every worker process grows its own tree from the same position
+    and their root visit counts are added together (root parallelisation).
+    Worker processes only import the rules engine, never pygame.
+
+    Attributes
+    ----------
+    time_limit : float | None
+        the number of seconds to search for per move
+    playout_limit : int | None
+        the number of playouts to search for per move
+    exploration : float
+        the exploration constant of UCT
+    workers : int
+        the number of processes to search with
+    playouts : int
+        the number of playouts made by the last search, across all workers
+    elapsed : float
+        the number of seconds the last search took
+    """
+
+    def __init__(self, time_limit: Optional[float] = 1.0, playout_limit: Optional[int] = None,
+                 exploration: float = 1.4, seed: Optional[int] = None, workers: int = 1):
+        if time_limit is None and playout_limit is None:
+            raise ValueError("a time limit or a playout limit is required")
+        self.time_limit = time_limit
+        self.playout_limit = playout_limit
+        self.exploration = exploration
+        self.random = random.Random(seed)
+        self.workers = workers
+        self.playouts = 0
+        self.elapsed = 0.0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        """
+        Starts the worker processes, if there is more than one worker, and waits until they have
+        started. Called by the first search if it has not been already; starting them takes most of a second.
+        """
+        if self.workers > 1 and self._executor is None:
+            # spawned workers start a fresh interpreter instead of inheriting pygame and the window
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            for future in [self._executor.submit(_ready) for _ in range(self.workers)]:
+                future.result()
+
+    def close(self):
+        """Shuts down the worker processes, if any were started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts / self.elapsed if self.elapsed else 0.0
+
+    def report(self) -> str:
+        """Returns the statistics of the last search."""
+        return f"{self.playouts} playouts in {self.elapsed:.2f}s ({self.playouts_per_second:.0f}/s)"
+
+    def choose_move(self, state: GameState, /) -> int:
+        """Searches from state and returns the most visited move. The state is restored before returning."""
+        moves = state.legal_moves()
+        if not moves:
+            raise ValueError("the game is over")
+        if self.workers > 1:
+            return self.choose_move_parallel(state, moves)
+        start = time.perf_counter()
+        deadline = None if self.time_limit is None else start + self.time_limit
+        root = self.search(state, moves, deadline, self.playout_limit)
+        self.elapsed = time.perf_counter() - start
+        return max(root.children, key=lambda child: child.visits).move
+
+    def choose_move_parallel(self, state: GameState, moves: List[int], /) -> int:
+        """
+        Searches from state in every worker until a shared deadline and returns the most visited move overall.
+        The deadline is set once the workers have started. If no worker manages a playout, searches locally instead.
+        """
+        self.start()
+        start = time.perf_counter()
+        deadline = None if self.time_limit is None else start + self.time_limit
+        playout_limit = None if self.playout_limit is None else -(-self.playout_limit // self.workers)
+        snapshot = state.snapshot()
+        futures = [self._executor.submit(_search_worker, snapshot, deadline, playout_limit,
+                                         self.exploration, self.random.getrandbits(64))
+                   for _ in range(self.workers)]
+        visits: Counter = Counter()
+        self.playouts = 0
+        for future in futures:
+            worker_visits, playouts = future.result()
+            visits.update(worker_visits)
+            self.playouts += playouts
+        if not visits:
+            playouts = self.playouts
+            root = self.search(state, list(moves), None, 1)  # the search pops the moves it tries
+            self.playouts += playouts
+            visits.update({child.move: child.visits for child in root.children})
+        self.elapsed = time.perf_counter() - start
+        return max(visits, key=lambda move: visits[move])
+
+    def search(self, state: GameState, moves: List[int], deadline: Optional[float], playout_limit: Optional[int]) -> _Node:
+        """
+        Grows a search tree from state until the deadline (a time.perf_counter value) or playout limit is reached.
+        At least one playout is always made, so that the root has a child to choose however small the budget.
+        """
+        root = _Node(None, None, moves, state.to_move ^ 1)
+        rng, exploration, clock = self.random, self.exploration, time.perf_counter
+        self.playouts = 0
+        while not root.children or ((playout_limit is None or self.playouts < playout_limit)
+                                    and (deadline is None or clock() < deadline)):
+            node, depth = root, 0
+            while not node.untried and node.children:
+                node = node.select(exploration)
+                state.apply(node.move)
+                depth += 1
+            if node.untried:
+                untried = node.untried
+                index = rng.randrange(len(untried))
+                untried[index], untried[-1] = untried[-1], untried[index]
+                move = untried.pop()
+                state.apply(move)
+                depth += 1
+                child = _Node(move, node, state.legal_moves(), state.to_move ^ 1)
+                node.children.append(child)
+                node = child
+            result = random_playout(state, rng)
+            while node is not None:
+                node.visits += 1
+                if result == node.player:
+                    node.wins += 1
+                elif result == DRAWN:
+                    node.wins += 0.5
+                node = node.parent
+            for _ in range(depth):
+                state.undo()
+            self.playouts += 1
+        return root
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    game = GameState()
+    with ComputerAI(seconds, workers=processes) as computer:
+        while game.status() == ONGOING:
+            chosen = computer.choose_move(game)
+            game.apply(chosen)
+            print(f"{len(game.history):2} {PLAYERS[game.to_move ^ 1]} {chosen:2}: {computer.report()}")
+    print("Draw" if game.status() == DRAWN else PLAYERS[game.status()] + " wins")
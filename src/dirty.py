@@ -0,0 +1,72 @@
+"""
+Sends only the parts of the window which have changed to the display
+"""
+
+__all__ = ["DirtyRects"]
+
+from typing import List, Union, Sequence, Optional, Callable
+import pygame
+
+RectLike = Union[pygame.Rect, Sequence[int]]
+
+
+class DirtyRects:
+    """
+    Collects the regions drawn on the display surface during a frame, then copies just those
+    regions to the window and passes them to pygame.display.update.
+    The regions drawn on the previous frame are sent again, since whatever was drawn there
+    (a projectile that has moved on, or longer text) has to be erased from the window.
+
+    Attributes
+    ----------
+    rects : list[pygame.Rect]
+        the regions drawn on the current frame
+    previous : list[pygame.Rect]
+        the regions drawn on the previous frame
+    full : bool
+        whether the whole window is sent on the next frame, after something else has drawn over it
+    on_present : Callable[[], None] | None
+        called just before pygame.display.update, which may block until the monitor refreshes
+    """
+
+    __slots__ = "rects", "previous", "full", "on_present"
+
+    def __init__(self, on_present: Optional[Callable[[], None]] = None):
+        self.rects: List[pygame.Rect] = []
+        self.previous: List[pygame.Rect] = []
+        self.full = True
+        self.on_present = on_present
+
+    def __len__(self):
+        return len(self.rects)
+
+    def add(self, rect: RectLike, /) -> pygame.Rect:
+        """Marks a region as drawn and returns it."""
+        self.rects.append(rect := pygame.Rect(rect))
+        return rect
+
+    def extend(self, rects: List[RectLike], /):
+        for rect in rects:
+            self.add(rect)
+
+    def invalidate(self):
+        """Makes the next frame send the whole window, e.g. when another loop has drawn over it."""
+        self.full = True
+
+    def flush(self, window: pygame.Surface, source: pygame.Surface, /) -> List[pygame.Rect]:
+        """Copies the changed regions of source onto window, updates them on the display and returns them."""
+        bounds = window.get_rect()
+        if self.full:
+            changed = [bounds]
+        else:
+            changed = [clipped for rect in self.rects + self.previous if (clipped := rect.clip(bounds))]
+            if sum(rect.w * rect.h for rect in changed) >= bounds.w * bounds.h:
+                changed = [bounds]  # the regions overlap so much that sending the whole window is cheaper
+        for rect in changed:
+            window.blit(source, rect, rect)
+        if self.on_present is not None:
+            self.on_present()
+        if changed:
+            pygame.display.update(changed)
+        self.previous, self.rects, self.full = self.rects, [], False
+        return changed
@@ -2,12 +2,23 @@ __all__ = ["Game"]
 
 import sys
 import os
-import socket
-import threading
+import asyncio
+from typing import Optional, Tuple, List, Dict
 import pygame
 import pygame.cursors
 from src.menu import MainMenu, OptionsMenu, PostGameMenu, ColourMenu, MultiplayerMenu, TutorialMenu
-from src.grid import Grid, DIMENSION, ASSETS_PATH, generate_highlighted_images
+from src.grid import Grid, DIMENSION, ASSETS_PATH
+from src.board import PLAYERS, cell_index
+from src.state import GameState, IllegalMoveError, ONGOING, DRAWN
+from src.computer import ComputerAI
+from src.renderer import BoardRenderer
+from src.resources import assets
+from src.dirty import DirtyRects
+from src.text import TextCache
+from src.scheduler import FrameScheduler, post_network_event
+from src.settings import Settings
+from src.protocol import Message, ProtocolError, MOVE, RESIGN, STATE_SYNC, encode_move, encode_resign, encode_state
+from src.network import NetworkEngine, Session, CLOSED
 
 
 class Game:
@@ -16,8 +27,13 @@ class Game:
         "O": "Noughts",
     }
 
-    def __init__(self, dimension: float):
-        """Initializes pygame and the instance of the game that is created."""
+    def __init__(self, dimension: float, *, settings: Optional[Settings] = None):
+        """
+        Initializes pygame and the instance of the game that is created.
+        The settings (by default, those saved by the user) choose the highlight colour, frame rate,
+        size of the window and the address games are hosted on.
+        """
+        self.settings = Settings.load() if settings is None else settings
         pygame.init()
         pygame.display.set_caption('Recursive Noughts and Crosses')
         pygame.display.set_icon(pygame.image.load(os.path.join(ASSETS_PATH, 'icon.png')))
@@ -30,10 +46,16 @@ class Game:
         self.BLACK, self.WHITE = (0, 0, 0), (255, 255, 255)
         self.DISPLAY_WIDTH, self.DISPLAY_HEIGHT = int(dimension * 3), int(dimension * 3 + self.Y_OFFSET)
         self.display = pygame.Surface(DISPLAY_VALUES := (self.DISPLAY_WIDTH, self.DISPLAY_HEIGHT))
-        self.window = pygame.display.set_mode(DISPLAY_VALUES)
+        self.window = self.create_window(DISPLAY_VALUES)
+        self.scheduler = FrameScheduler(self.settings.target_fps)
+        # the regions of self.display drawn since the window was last updated
+        self.dirty = DirtyRects(on_present=self.scheduler.end_work)
         self.font_name = pygame.font.match_font('comicsansms')
+        self.text_cache = TextCache()
+        self.network = NetworkEngine(post_network_event)  # wakes the loops whenever a connection or message arrives
         self.last_winner = None
-        self.highlight = (255, 0, 0)
+        self.computer_time_limit = 2.0  # enough for tens of thousands of playouts a move on one core
+        self.computer_workers = 1
         self.main_menu = MainMenu(self)
         self.options_menu = OptionsMenu(self)
         self.post_game_menu = PostGameMenu(self)
@@ -42,33 +64,77 @@ class Game:
         self.tutorial_menu = TutorialMenu(self)
         self.current_menu = self.main_menu
         self.generate_highlighted_images()
-        self.H_IMAGES = {
-            'X': pygame.image.load(os.path.join(ASSETS_PATH, 'CX.png')),
-            'O': pygame.image.load(os.path.join(ASSETS_PATH, 'CO.png')),
-        }
+
+    def create_window(self, size: Tuple[int, int], /) -> pygame.Surface:
+        """
+        Opens the window, scaled by the scale setting. The game is always drawn at its own size;
+        scaled windows (which vsync also needs) are stretched to fit by SDL.
+        """
+        if self.settings.scale == 1 and not self.settings.vsync:
+            return pygame.display.set_mode(size)
+        window = pygame.display.set_mode(size, pygame.SCALED, vsync=int(self.settings.vsync))
+        if self.settings.scale != 1:
+            try:
+                from pygame._sdl2.video import Window
+                Window.from_display_module().size = tuple(round(length * self.settings.scale) for length in size)
+            except (ImportError, AttributeError, pygame.error):
+                pass  # SDL chooses the scale instead
+        return window
+
+    @property
+    def highlight(self) -> Tuple[int, int, int]:
+        """The colour of highlighted text and sprites."""
+        return self.settings.highlight
+
+    @property
+    def particle_density(self) -> float:
+        return self.settings.particle_density
+
+    @property
+    def H_IMAGES(self) -> Dict[str, pygame.Surface]:
+        """The highlighted noughts and crosses, as regions of the sprite atlas so they follow changes to the highlight colour."""
+        return {'X': assets.surface('CX'), 'O': assets.surface('CO')}
 
     def play_game(self):
         self.check_events()
         if self.playing:
             if self.current_menu.state == "Play":
                 self.game_loop()
+            elif self.current_menu.state == "Computer":
+                with ComputerAI(self.computer_time_limit, workers=self.computer_workers) as computer:
+                    self.game_loop(computer)
             elif self.current_menu.state == "Host":
                 self.server_multiplayer()
             elif self.current_menu.state == "Join":
                 self.client_multiplayer()
 
-    def game_loop(self):
-        """The main event loop which runs while the game is being played."""
+    def game_loop(self, computer: Optional[ComputerAI] = None):
+        """
+        The main event loop which runs while the game is being played.
+        If computer is given, it plays as noughts. Its search runs on this thread without handling
+        events, so quitting or leaving the game waits until it has moved (up to its time limit).
+        """
         pygame.mouse.set_visible(True)
-        grid = Grid(Grid)
-        player, current, previous, played = 'X', None, None, False
-        play, win, draw = False, False, False
-        turn_str = "' turn"
-        status_message = Game.SHORT_TO_LONG[player] + turn_str
-        clock = pygame.time.Clock()
+        state = GameState()
+        grid = Grid(Grid, board=state.board)
+        renderer = BoardRenderer(state.board)
+        shown_message = None
+        self.dirty.invalidate()
+        status_message = self.get_status_message(state)
         pygame.mouse.set_cursor(*pygame.cursors.broken_x)
         while self.playing:
-            for event in pygame.event.get():
+            self.draw_frame(renderer, status_message, shown_message)
+            shown_message = status_message
+
+            if state.status() != ONGOING:
+                self.end_game(grid, status_message)
+                break
+            if computer is not None and state.player == 'O':
+                state.apply(computer.choose_move(state))
+                pygame.mouse.set_cursor(*pygame.cursors.broken_x)
+                status_message = self.get_status_message(state)
+                continue
+            for event in self.get_events():
                 if event.type == pygame.QUIT:
                     self.quit()
                 if event.type == pygame.KEYDOWN:
@@ -78,76 +144,22 @@ class Game:
                         self.reset_keys()
                         pygame.mouse.set_visible(False)
                         return
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if pygame.mouse.get_pressed()[0]:
-                        mouse_position = pygame.mouse.get_pos()
-                        large_y, small_y = Grid.get_grid_positions(mouse_position[1] - 100)
-                        large_x, small_x = Grid.get_grid_positions(mouse_position[0])
-                        if (inner_grid := grid[large_y][large_x])[small_y][small_x] is not None:
-                            status_message = "This square is already taken"
-                        elif current is None:
-                            play = True
+                if event.type == pygame.MOUSEBUTTONDOWN and state.status() == ONGOING:
+                    if pygame.mouse.get_pressed()[0] and (move := self.get_move(pygame.mouse.get_pos())) is not None:
+                        try:
+                            state.apply(move)
+                        except IllegalMoveError as error:
+                            status_message = str(error)
                         else:
-                            if inner_grid.played:
-                                status_message = "This grid has already been played"
-                            elif current == (large_y, large_x):
-                                play = True
-                            else:
-                                status_message = "You cannot play in this square"
-
-                        if play:
-                            grid[large_y][large_x][small_y][small_x] = player
-                            previous, = player
-                            if previous == 'X':
+                            if state.player == 'O':
                                 pygame.mouse.set_cursor(*pygame.cursors.diamond)
                             else:
                                 pygame.mouse.set_cursor(*pygame.cursors.broken_x)
-                            player = Grid.switch_player(player)
-                            play = False
-                            status_message = Game.SHORT_TO_LONG[player] + turn_str
-                            if not grid[large_y][large_x].win(previous):
-                                grid[large_y][large_x].draw()
-                            if win := grid.win(previous, winning_combination=True):
-                                status_message = Game.SHORT_TO_LONG[previous] + " is the winner!"
-                                played = True
-                            elif grid.draw():
-                                played = True
-                            elif not inner_grid.played and not grid[small_y][small_x].played:
-                                current = (small_y, small_x)
-                            else:
-                                current = None
-
-            self.display.fill(self.BLACK)
-            self.draw_top_text(status_message)
-            self.window.blit(self.display, (0, 0))
-            grid.draw_grid(self.window)
-
-            if played and win:
-                Grid.draw_winner(Grid.switch_player(player), win, self.window, self.H_IMAGES)
-            elif played and draw:
-                status_message = "Draw!"
-            if played:
-                pygame.display.update()
-                pygame.time.delay(5000)
-                pygame.mouse.set_visible(False)
-                self.playing = False
-                self.post_game_menu.message = status_message
-                self.current_menu = self.post_game_menu
-                self.reset_keys()
-                break
-            pygame.display.update()
-            clock.tick(60)
+                            status_message = self.get_status_message(state)
 
     def server_multiplayer(self):
-        host = '127.0.0.1'
-        port = 65432
-        connection_established = False
-        connection, address = None, None
-
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.bind((host, port))
-            sock.listen(1)
+            listener = self.network.listen(self.settings.host, self.settings.port)
         except OSError:
             self.display.fill(self.BLACK)
             self.draw_text("A game is already being hosted", 30, int(self.DISPLAY_WIDTH / 2),
@@ -159,40 +171,29 @@ class Game:
             pygame.time.delay(3000)
             return
 
-        def receive_data():
-            nonlocal turn, player, status_message, current
-            while True:
-                data = connection.recv(1024).decode()
-                y, x, iy, ix, playing, current = data.split('-')
-                y, x, iy, ix, current = int(y), int(x), int(iy), int(ix), eval(current)
-                grid[y][x][iy][ix] = 'O'
-                turn = True
-                if not eval(playing):
-                    self.playing = False
-                player = 'X'
-                status_message = Game.SHORT_TO_LONG[player] + turn_str
-                grid[y][x].win('O')
-                grid[y][x].draw()
-
-        def await_connection():
-            nonlocal connection_established, connection, address, status_message
-            connection, address = sock.accept()  # wait for a connection; blocking call
-            status_message = 'Client has connected'
-            connection_established = True
-            receive_data()
-
-        thread = threading.Thread(target=await_connection)
-        thread.daemon = True
-        thread.start()
+        connection: Optional[Session] = None
         pygame.mouse.set_visible(True)
-        grid = Grid(Grid)
-        player, current, previous, played = 'X', None, None, False
-        play, win, draw = False, False, False
-        turn_str = "' turn"
-        turn = True
+        state = GameState()
+        grid = Grid(Grid, board=state.board)
+        renderer = BoardRenderer(state.board)
+        shown_message = None
+        self.dirty.invalidate()
         status_message = "Waiting for client..."
         while self.playing:
-            for event in pygame.event.get():
+            if connection is None and (connection := listener.accept()) is not None:
+                listener.close()  # only one player can join
+                connection.send(encode_state(state.moves))
+                status_message = 'Client has connected'
+            if connection is not None:
+                status_message = self.receive_messages(state, connection, status_message, 'O')
+            self.draw_frame(renderer, status_message, shown_message)
+            shown_message = status_message
+
+            if state.status() != ONGOING:
+                self.end_game(grid, status_message)
+                connection.close()
+                break
+            for event in self.get_events():
                 if event.type == pygame.QUIT:
                     self.quit()
                 if event.type == pygame.KEYDOWN:
@@ -200,76 +201,21 @@ class Game:
                         self.playing = False
                         self.current_menu = self.main_menu
                         self.reset_keys()
+                        listener.close()
+                        self.leave_game(connection)
                         return
-                if event.type == pygame.MOUSEBUTTONDOWN and connection_established:
+                if event.type == pygame.MOUSEBUTTONDOWN and connection is not None and state.status() == ONGOING:
                     if pygame.mouse.get_pressed()[0]:
-                        if turn:
-                            mouse_position = pygame.mouse.get_pos()
-                            large_y, small_y = Grid.get_grid_positions(mouse_position[1] - 100)
-                            large_x, small_x = Grid.get_grid_positions(mouse_position[0])
-                            if (inner_grid := grid[large_y][large_x])[small_y][small_x] is not None:
-                                status_message = "This square is already taken"
-                            elif current is None:
-                                play = True
-                            else:
-                                if inner_grid.played:
-                                    status_message = "This grid has already been played"
-                                elif current == (large_y, large_x):
-                                    play = True
-                                else:
-                                    status_message = "You cannot play in this square"
-
-                            if play:
-                                grid[large_y][large_x][small_y][small_x] = 'X'
-                                previous, = player
-                                player = Grid.switch_player(player)
-                                if not grid[large_y][large_x].win(previous):
-                                    grid[large_y][large_x].draw()
-                                if win := grid.win(previous, winning_combination=True):
-                                    status_message = Game.SHORT_TO_LONG[previous] + " is the winner!"
-                                    played = True
-                                elif grid.draw():
-                                    played = True
-                                elif not inner_grid.played and not grid[small_y][small_x].played:
-                                    current = (small_y, small_x)
-                                else:
-                                    current = None
-                                if not played:
-                                    send_data = f"{large_y}-{large_x}-{small_y}-{small_x}-{self.playing}-{current}".encode()
-                                    connection.send(send_data)
-                                    play, turn = False, False
-                                    status_message = Game.SHORT_TO_LONG[player] + turn_str
+                        if state.player == 'X':
+                            if (move := self.get_move(pygame.mouse.get_pos())) is not None:
+                                status_message = self.send_move(state, move, connection)
                         else:
                             status_message = "It is not your turn"
 
-            self.display.fill(self.BLACK)
-            self.draw_top_text(status_message)
-            self.window.blit(self.display, (0, 0))
-            grid.draw_grid(self.window)
-
-            if played and win:
-                Grid.draw_winner(Grid.switch_player(player), win, self.window, self.H_IMAGES)
-            elif played and draw:
-                status_message = "Draw!"
-            if played:
-                pygame.display.update()
-                pygame.time.delay(5000)
-                pygame.mouse.set_visible(False)
-                self.playing = False
-                self.post_game_menu.message = status_message
-                self.current_menu = self.post_game_menu
-                self.reset_keys()
-                break
-            pygame.display.update()
-
     def client_multiplayer(self):
-        host = "127.0.0.1"
-        port = 65432
-
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.connect((host, port))
-        except ConnectionRefusedError:
+            connection = self.network.connect(self.settings.host, self.settings.port)
+        except (OSError, asyncio.TimeoutError):
             self.display.fill(self.BLACK)
             self.draw_text("No games found", 30, int(self.DISPLAY_WIDTH / 2), int(self.DISPLAY_HEIGHT / 2))
             self.window.blit(self.display, (0, 0))
@@ -279,33 +225,23 @@ class Game:
             pygame.time.delay(3000)
             return
 
-        def receive_data():
-            nonlocal turn, player, status_message, current
-            while True:
-                data = sock.recv(1024).decode()
-                y, x, iy, ix, playing, current = data.split('-')
-                y, x, iy, ix, current = int(y), int(x), int(iy), int(ix), eval(current)
-                turn = True
-                grid[y][x][iy][ix] = 'X'
-                if not eval(playing):
-                    self.playing = False
-                player = 'O'
-                status_message = Game.SHORT_TO_LONG[player] + turn_str
-                grid[y][x].win('X')
-                grid[y][x].draw()
-
-        thread = threading.Thread(target=receive_data)
-        thread.daemon = True
-        thread.start()
         pygame.mouse.set_visible(True)
-        grid = Grid(Grid)
-        player, current, played = 'X', None, False
-        play, win, draw = False, False, False
-        turn_str = "' turn"
-        turn = False
+        state = GameState()
+        grid = Grid(Grid, board=state.board)
+        renderer = BoardRenderer(state.board)
+        shown_message = None
+        self.dirty.invalidate()
         status_message = "Connected to server"
         while self.playing:
-            for event in pygame.event.get():
+            status_message = self.receive_messages(state, connection, status_message, 'X')
+            self.draw_frame(renderer, status_message, shown_message)
+            shown_message = status_message
+
+            if state.status() != ONGOING:
+                self.end_game(grid, status_message)
+                connection.close()
+                break
+            for event in self.get_events():
                 if event.type == pygame.QUIT:
                     self.quit()
                 if event.type == pygame.KEYDOWN:
@@ -313,71 +249,133 @@ class Game:
                         self.playing = False
                         self.current_menu = self.main_menu
                         self.reset_keys()
+                        self.leave_game(connection)
                         return
-                if event.type == pygame.MOUSEBUTTONDOWN:
+                if event.type == pygame.MOUSEBUTTONDOWN and state.status() == ONGOING:
                     if pygame.mouse.get_pressed()[0]:
-                        if turn:
-                            mouse_position = pygame.mouse.get_pos()
-                            large_y, small_y = Grid.get_grid_positions(mouse_position[1] - self.Y_OFFSET)
-                            large_x, small_x = Grid.get_grid_positions(mouse_position[0])
-                            if (inner_grid := grid[large_y][large_x])[small_y][small_x] is not None:
-                                status_message = "This square is already taken"
-                            elif current is None:
-                                play = True
-                            else:
-                                if inner_grid.played:
-                                    status_message = "This grid has already been played"
-                                elif current == (large_y, large_x):
-                                    play = True
-                                else:
-                                    status_message = "You cannot play in this square"
-
-                            if play:
-                                grid[large_y][large_x][small_y][small_x] = 'O'
-                                previous, = player
-                                player = Grid.switch_player(player)
-                                if not grid[large_y][large_x].win(previous):
-                                    grid[large_y][large_x].draw()
-                                if win := grid.win(previous, winning_combination=True):
-                                    status_message = Game.SHORT_TO_LONG[previous] + " is the winner!"
-                                    played = True
-                                elif grid.draw():
-                                    played = True
-                                elif not inner_grid.played and not grid[small_y][small_x].played:
-                                    current = (small_y, small_x)
-                                else:
-                                    current = None
-                                if not played:
-                                    send_data = f"{large_y}-{large_x}-{small_y}-{small_x}-{self.playing}-{current}".encode()
-                                    sock.send(send_data)
-                                    turn, play = False, False
-                                    status_message = Game.SHORT_TO_LONG[player] + turn_str
+                        if state.player == 'O':
+                            if (move := self.get_move(pygame.mouse.get_pos())) is not None:
+                                status_message = self.send_move(state, move, connection)
                         else:
                             status_message = "It is not your turn"
 
-            self.display.fill(self.BLACK)
+    def draw_frame(self, renderer: BoardRenderer, status_message: str, shown_message: Optional[str], /):
+        """
+        Draws whatever has changed since the last frame of a game, and updates only those regions of the window:
+        the status message, if it is not the one shown, and the sub-boards which have changed.
+        """
+        if status_message != shown_message:
+            self.dirty.add(self.display.fill(self.BLACK, (0, 0, self.DISPLAY_WIDTH, int(self.Y_OFFSET))))
             self.draw_top_text(status_message)
-            self.window.blit(self.display, (0, 0))
-            grid.draw_grid(self.window)
-
-            if played and win:
-                Grid.draw_winner(Grid.switch_player(player), win, self.window, self.H_IMAGES)
-            elif played and draw:
-                status_message = "Draw!"
-            if played:
-                pygame.display.update()
-                pygame.time.delay(5000)
-                pygame.mouse.set_visible(False)
-                self.playing = False
-                self.post_game_menu.message = status_message
-                self.current_menu = self.post_game_menu
-                self.reset_keys()
-                break
-            pygame.display.update()
+        self.dirty.extend(renderer.draw_changes(self.display))
+        self.dirty.flush(self.window, self.display)
+
+    def get_move(self, mouse_position: Tuple[int, int], /) -> Optional[int]:
+        """Returns the move under the mouse, or None if the mouse is above the grid."""
+        if mouse_position[1] < self.Y_OFFSET:
+            return None
+        large_y, small_y = Grid.get_grid_positions(mouse_position[1] - self.Y_OFFSET)
+        large_x, small_x = Grid.get_grid_positions(mouse_position[0])
+        return cell_index(large_y, large_x, small_y, small_x)
+
+    @staticmethod
+    def get_status_message(state: GameState, /) -> str:
+        """Returns the message shown at the top of the screen for the current state of a game."""
+        if (status := state.status()) == ONGOING:
+            return Game.SHORT_TO_LONG[state.player] + "' turn"
+        elif status == DRAWN:
+            return "Draw!"
+        return Game.SHORT_TO_LONG[PLAYERS[status]] + " is the winner!"
+
+    def send_move(self, state: GameState, move: int, connection: Session, /) -> str:
+        """Makes a move for the local player and sends it to the other player. Returns the new status message."""
+        if connection.closed:
+            return "The other player has left"
+        try:
+            state.apply(move)
+        except IllegalMoveError as error:
+            return str(error)
+        connection.send(encode_move(move))
+        return self.get_status_message(state)
+
+    def receive_move(self, state: GameState, move: int, /) -> str:
+        """Makes a move received from the other player. Returns the new status message."""
+        state.apply(move)
+        return self.get_status_message(state)
+
+    def receive_messages(self, state: GameState, connection: Session, status_message: str, remote: str, /) -> str:
+        """
+        Acts on the messages which have arrived from the other player, who plays remote ('X' or 'O'),
+        since the last frame, and returns the new status message. The network engine only queues them,
+        so that the game is only ever changed on this thread.
+        """
+        for message in connection.receive():
+            try:
+                status_message = self.handle_message(state, message, remote) or status_message
+            except (ProtocolError, IllegalMoveError):
+                connection.close()
+                return "The other player sent an invalid move"
+        return status_message
+
+    def handle_message(self, state: GameState, message: Message, remote: str, /) -> Optional[str]:
+        """
+        Acts on a message from the other player, who plays remote. Returns the new status message, if it
+        has changed. Raises ProtocolError if they move when it is not their turn, or send a STATE_SYNC
+        other than the host's first message.
+        """
+        if message.kind == MOVE:
+            if state.player != remote:
+                raise ProtocolError(f"{remote} moved out of turn")
+            return self.receive_move(state, message.value)
+        if message.kind == RESIGN:
+            return "The other player has left"
+        if message.kind == CLOSED:
+            return message.value if state.status() == ONGOING else None
+        if message.kind == STATE_SYNC:
+            # only the host (X) syncs, once, as it is joined: before either player has moved
+            if remote != 'X' or state.moves:
+                raise ProtocolError("only the host syncs the game, as it is joined")
+            for move in message.value:
+                if state.player != remote:
+                    raise ProtocolError(f"{remote} moved out of turn")
+                state.apply(move)
+            return self.get_status_message(state)
+        return None
 
-    def check_events(self):
-        """Gets data from the event loop and sets the values of the key state variables"""
-        for event in pygame.event.get():
+    @staticmethod
+    def leave_game(connection: Optional[Session], /):
+        """Tells the other player this one is leaving, if they are connected, and closes the connection."""
+        if connection is not None:
+            connection.close(encode_resign())
+
+    def end_game(self, grid: Grid, status_message: str, /):
+        """Shows the finished grid for five seconds, then moves to the post game menu."""
+        if (winner := grid.winner) is not None:
+            Grid.draw_winner(winner, grid.win(winner, winning_combination=True), self.window, self.H_IMAGES)
+        pygame.display.update()
+        pygame.time.delay(5000)
+        pygame.mouse.set_visible(False)
+        self.playing = False
+        self.post_game_menu.message = status_message
+        self.current_menu = self.post_game_menu
+        self.reset_keys()
+
+    def get_events(self, timeout: Optional[float] = None, /) -> List[pygame.event.Event]:
+        """
+        Returns the pending events, sleeping until one arrives or timeout seconds have passed if there are none.
+        The whole window is redrawn on the next frame if it has been uncovered.
+        """
+        events = self.scheduler.wait(timeout)
+        if any(event.type == pygame.VIDEOEXPOSE for event in events):
+            self.dirty.invalidate()
+        return events
+
+    def check_events(self, timeout: Optional[float] = 0.0, /):
+        """
+        Gets data from the event loop and sets the values of the key state variables.
+        Waits up to timeout seconds (forever if None) for an event if there are none.
+        """
+        for event in self.get_events(timeout):
             if event.type == pygame.QUIT:
                 self.quit()
             if event.type == pygame.KEYDOWN:
@@ -401,11 +399,11 @@ class Game:
 
     def draw_text(self, text: str, size: int, x: int, y: int, /):
         """Draws text to the game's display."""
-        font = pygame.font.Font(self.font_name, size)
-        text_surface = font.render(text, True, self.highlight if y == self.current_menu.cursor_rect.y else self.WHITE)
+        colour = self.highlight if y == self.current_menu.cursor_rect.y else self.WHITE
+        text_surface = self.text_cache.render(self.font_name, text, size, colour)
         text_rect = text_surface.get_rect()
         text_rect.center = (x, y)
-        self.display.blit(text_surface, text_rect)
+        self.dirty.add(self.display.blit(text_surface, text_rect))
 
     def draw_top_text(self, text: str):
         """Draws text to the top of the screen. Used during the game to provide status messages to the user."""
@@ -413,19 +411,21 @@ class Game:
 
     def generate_highlighted_images(self):
         """
-        Generates the highlighted noughts and crosses.
+        Tints the highlighted noughts and crosses in the highlight colour.
         Used when the game is initialized and when the user changes the highlight colour.
+        Colours which have been used before are loaded from the tinted sprite cache.
         """
-        if not os.path.exists(os.path.join(ASSETS_PATH, 'CX.png')):
-            os.remove(os.path.join(ASSETS_PATH, 'CX.png'))
-            os.remove(os.path.join(ASSETS_PATH, 'CO.png'))
-        generate_highlighted_images(self.highlight)
+        assets.set_highlight(self.highlight)
+
+    def set_highlight(self, colour: Tuple[int, int, int], /):
+        """Changes the highlight colour, saving it in the settings."""
+        self.settings.update(highlight=tuple(colour))
+        self.generate_highlighted_images()
 
     def quit(self):
         """Function used to quit the game and de-initialize pygame."""
-        self.highlight = (255, 0, 0)
-        self.generate_highlighted_images()
         self.running, self.playing = False, False
         self.current_menu.run_display = False
+        self.network.stop()
         pygame.quit()
         sys.exit()
@@ -1,81 +1,73 @@
-__all__ = ["Graphics", "Projectile"]
+"""
+The noughts and crosses falling behind the menus
+"""
 
-import os
-import random
-from typing import Tuple, Optional
-import pygame
-from src.grid import SMALL_IMAGES, IMAGES, ASSETS_PATH
-
-
-class Projectile:
+__all__ = ["Particles", "KINDS", "SPACING"]
 
-    __slots__ = "IMAGE", "y", "x", "speed"
-
-    def __init__(self, player: str, number: int, speed: float, position: Tuple[int, int]):
-        self.IMAGE = ALL_IMAGES[number][player]
-        self.y, self.x = position
-        self.speed = speed
+from itertools import repeat
+from typing import List, Optional
+import numpy as np
+import pygame
+from src.resources import assets, LARGE, SMALL
+
+# the sprite of each kind of particle, as its name in the atlas and its size. Every kind is as likely,
+# so a particle is small three times as often as it is large, and large ones are sometimes highlighted
+KINDS = tuple((prefix + player, size) for player in ('X', 'O')
+              for prefix, size in (('', LARGE), ('', SMALL), ('', SMALL), ('', SMALL), ('C', LARGE)))
+SPACING = 50  # the number of pixels of width per particle at a density of 1
+
+
+class Particles:
+    """
+    The falling particles, stored as a structure of arrays so that every particle is moved at once.
+    Particles start just above the top of the area at a random column, fall a constant number
+    of pixels each frame and start again once they have fallen past the bottom.
+
+    Attributes
+    ----------
+    width, height : int
+        the size of the area the particles fall through
+    x, y : numpy.ndarray[float]
+        the position of the top left corner of each particle
+    speed : numpy.ndarray[float]
+        the number of pixels each particle falls per frame
+    kind : numpy.ndarray[int]
+        the index into KINDS of each particle's sprite
+    """
+
+    __slots__ = "width", "height", "x", "y", "speed", "kind", "_random"
+
+    def __init__(self, width: int = 600, height: int = 700, density: float = 1.0, seed: Optional[int] = None):
+        """Creates one particle for every SPACING / density pixels of width."""
+        self.width, self.height = width, height
+        count = max(0, round(width / SPACING * density))
+        self._random = np.random.default_rng(seed)
+        self.x, self.y, self.speed = np.empty(count), np.empty(count), np.empty(count)
+        self.kind = np.empty(count, dtype=np.intp)
+        self._spawn(np.arange(count))
+
+    def __len__(self):
+        return len(self.kind)
 
     def __repr__(self):
-        return f"Projectile(width={self.IMAGE.get_width()}, y={self.y}, x={self.x}, speed={self.speed})"
+        return f"Particles(width={self.width}, height={self.height}, count={len(self)})"
 
-    def __iter__(self):
-        return self
+    def _spawn(self, index: np.ndarray, /):
+        count = len(index)
+        self.y[index] = self._random.integers(-100, 1, count)
+        self.x[index] = self._random.integers(0, self.width + 1, count)
+        self.speed[index] = self._random.integers(10, 51, count) / 10
+        self.kind[index] = self._random.integers(0, len(KINDS), count)
 
-    def __next__(self):
+    def step(self):
+        """Moves every particle down, starting those which have fallen out of the area again."""
         self.y += self.speed
-        return self.y
-
-    @classmethod
-    def generate(cls, domain: int):
-        return cls(random.choice(('X', 'O')), random.randint(0, 4), random.randint(10, 50) / 10,
-                   (random.randint(-100, 0), random.randint(0, domain)))
-
-    def get_position(self):
-        return self.x, self.y
-
-    def draw(self, screen: pygame.Surface):
-        screen.blit(self.IMAGE, self.get_position())
-
-
-class Graphics:
-
-    __slots__ = "sections", "domain", "section"
-
-    def __init__(self, domain: Optional[int] = 600, size: Optional[int] = 50):
-        sections = range(size, domain + 1, size)
-        projectiles = map(Projectile.generate, sections)
-        self.sections = dict(zip(sections, projectiles))
-        self.domain = domain
-        self.section = size
-
-    def __getitem__(self, item):
-        return self.sections[item]
-
-    def __setitem__(self, key, value):
-        self.sections[key] = value
-
-    def set_next_state(self):
-        for projectile in self.sections.values():
-            yield next(projectile)
-
-    def get_next_state(self):
-        yield from self.set_next_state()
-
-    def next(self):
-        return list(self.get_next_state())
-
-    @classmethod
-    def reload(cls):
-        ALL_IMAGES[len(ALL_IMAGES) - 1] = {'X': pygame.image.load(os.path.join(ASSETS_PATH, "CX.png")),
-                                           'O': pygame.image.load(os.path.join(ASSETS_PATH, "CO.png"))}
-
-
-ALL_IMAGES = {
-    0: IMAGES,
-    1: SMALL_IMAGES,
-    2: SMALL_IMAGES,
-    3: SMALL_IMAGES,
-    4: {'X': pygame.image.load(os.path.join(ASSETS_PATH, "CX.png")),
-        'O': pygame.image.load(os.path.join(ASSETS_PATH, "CO.png"))},
-}
+        if len(fallen := np.flatnonzero(self.y > self.height)):
+            self._spawn(fallen)
+
+    def draw(self, target: pygame.Surface, /) -> List[pygame.Rect]:
+        """Draws every particle onto target in one call to Surface.blits and returns the regions drawn."""
+        atlas, _ = assets.sprite(*KINDS[0])
+        rects = [assets.rects[kind] for kind in KINDS]
+        sprites = zip(repeat(atlas), zip(self.x.tolist(), self.y.tolist()), map(rects.__getitem__, self.kind.tolist()))
+        return target.blits(sprites) or []
@@ -2,13 +2,18 @@
 The program's most important file
 """
 
-__all__ = ["Grid", "DIMENSION", "ASSETS_PATH", "SMALL_IMAGES", "IMAGES", "WIN_COMBINATIONS", "Coordinate", "generate_highlighted_images"]
+from __future__ import annotations
+
+__all__ = ["Grid", "DIMENSION", "ASSETS_PATH", "SMALL_IMAGES", "IMAGES", "WIN_COMBINATIONS", "Coordinate",
+           "generate_highlighted_images", "tint"]
 
 import os
 import copy
-from typing import Union, Optional, Any, NamedTuple, Tuple, List, Dict
-from PIL import Image  # type: ignore
-import pygame
+from typing import Union, Optional, Any, NamedTuple, Tuple, List, Dict, TYPE_CHECKING
+from src.board import Board, PLAYERS, WIN_COMBINATIONS, FULL_MASK, cell_index
+
+if TYPE_CHECKING:  # the rules are used without pygame, e.g. by the computer's worker processes
+    import pygame
 
 ASSETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
 
@@ -30,6 +35,7 @@ def _add_to_tuple(tuple_: Tuple[Number, Number], x: Number, y: Number, /) -> Coo
 
 
 def _image_resize(name: str, directory: str, resize_values: IntTuple):
+    from PIL import Image  # type: ignore
     image = Image.open(directory)
     new_image = image.resize(resize_values, Image.ANTIALIAS)
     new_image.save(os.path.join(ASSETS_PATH, name + '.png'))
@@ -40,21 +46,19 @@ def _generate_small_images(dimension: int):
     _image_resize('IO', nought_path, (dimension, dimension))
 
 
-def generate_highlighted_images(colour: Tuple[int, int, int]):
-    def _highlight_image(path: str):
-        img = Image.open(path)
-        white = (255,) * 3
-
-        for x in range(img.width):
-            for y in range(img.height):
-                pixel = img.getpixel((x, y))
-                if pixel[:-1] == white:
-                    img.putpixel((x, y), colour)
+def tint(image: pygame.Surface, colour: Tuple[int, int, int], /) -> pygame.Surface:
+    """Returns a copy of an image with its white pixels in colour, changing every pixel at once with surfarray."""
+    import pygame.surfarray
+    tinted = image.copy()
+    pixels = pygame.surfarray.pixels3d(tinted)
+    pixels[(pixels == 255).all(axis=2)] = colour
+    del pixels  # unlocks the surface
+    return tinted
 
-        img.save(os.path.join(ASSETS_PATH, 'C' + os.path.basename(path)))
 
-    _highlight_image(os.path.join(ASSETS_PATH, 'X.png'))
-    _highlight_image(os.path.join(ASSETS_PATH, 'O.png'))
+def generate_highlighted_images(colour: Tuple[int, int, int]) -> Dict[str, pygame.Surface]:
+    """Returns the noughts and crosses highlighted in colour. They are made in memory, not written to the assets."""
+    return {player: tint(image, colour) for player, image in __getattr__("IMAGES").items()}
 
 
 def _add_offset_to_iter(iterable):
@@ -65,19 +69,19 @@ def apply_y_offset(lines: Lines):
     return list(map(_add_offset_to_iter, lines))
 
 
-SMALL_IMAGES = {
-    'X': pygame.image.load(os.path.join(ASSETS_PATH, 'IX.png')),
-    'O': pygame.image.load(os.path.join(ASSETS_PATH, 'IO.png')),
-}
+def __getattr__(name: str):
+    """Loads SMALL_IMAGES and IMAGES (the plain noughts and crosses) from the sprite atlas the first time they are used."""
+    if name in ("SMALL_IMAGES", "IMAGES"):
+        from src.resources import assets, LARGE, SMALL  # the resources are built on this module
+        size = SMALL if name == "SMALL_IMAGES" else LARGE
+        images = globals()[name] = {player: assets.surface(player, size) for player in PLAYERS}
+        return images
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 cross_path = os.path.join(ASSETS_PATH, "X.png")
 nought_path = os.path.join(ASSETS_PATH, "O.png")
 
-IMAGES = {
-    'X': pygame.image.load(cross_path),
-    'O': pygame.image.load(nought_path),
-}
-
 OFFSET = 10.0
 DIMENSION = 200.0
 Y_OFFSET = int(DIMENSION / 2)
@@ -96,26 +100,46 @@ INNER_GRID_LINES = [
     ((INNER_DIMENSION * 2, 0 + INNER_OFFSET), (INNER_DIMENSION * 2, DIMENSION - INNER_OFFSET))
 ]
 GRID_LINES, INNER_GRID_LINES = apply_y_offset(GRID_LINES), apply_y_offset(INNER_GRID_LINES)
-WIN_COMBINATIONS = [
-    ((0, 0), (0, 1), (0, 2)),
-    ((0, 0), (1, 0), (2, 0)),
-    ((1, 0), (1, 1), (1, 2)),
-    ((0, 1), (1, 1), (2, 1)),
-    ((2, 0), (2, 1), (2, 2)),
-    ((0, 2), (1, 2), (2, 2)),
-    ((0, 0), (1, 1), (2, 2)),
-    ((0, 2), (1, 1), (2, 0))
-]
+
+
+class _Row:
+    """A row of a Grid. Reads and writes go straight through to the grid's Board."""
+
+    __slots__ = "grid", "y"
+
+    def __init__(self, grid: "Grid", y: int, /):
+        self.grid = grid
+        self.y = y
+
+    def __iter__(self):
+        return (self.grid.get(self.y, x) for x in range(3))
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, x: int):
+        return self.grid.get(self.y, x)
+
+    def __setitem__(self, x: int, value: Optional[str]):
+        self.grid.set(self.y, x, value)
 
 
 class Grid:
     """
-    Initializes a two-dimensional array with the values of each row set to value.
-    This value can either be a NoneType or a Grid object (for recursively creating child grids).
-    The parent grid is a four-dimensional array.
+    A view over a Board which behaves like a two-dimensional array.
+    Grid(Grid) creates a parent grid (a four-dimensional array) over a new Board,
+    whose elements are child grids viewing one sub-board each.
+    Grid() creates a single child grid.
 
     Attributes
     ----------
+    board : Board
+        the state of the whole game, shared by the parent and all of its children
+    index : int | None
+        the sub-board (0-8) a child grid views, or None for the parent
     played : bool
         indicates whether or not a grid has been played. A grid is played if
         a draw or win is achieved
@@ -125,41 +149,75 @@ class Grid:
         indicates whether or not a Grid object is a child of another Grid object
     """
 
-    __slots__ = "_array", "played", "winner", "is_child"
+    __slots__ = "board", "index"
 
-    def __init__(self, value: Optional[Any] = None, /):
-        self._array: list = [[value() if value is not None else None for _ in range(3)] for _ in range(3)]
-        self.played: bool = False
-        self.winner: Union[None, str] = None
-        self.is_child: bool = True if value is None else False
+    def __init__(self, value: Optional[Any] = None, /, *, board: Optional[Board] = None, index: Optional[int] = None):
+        self.board: Board = Board() if board is None else board
+        self.index: Optional[int] = None if value is not None else (0 if index is None else index)
 
     def __iter__(self):
         """Returns the grid as an iterator."""
-        return iter(self._array)
+        return (_Row(self, y) for y in range(3))
 
     def __repr__(self):
         """Returns repr() of the grid."""
-        return repr(self._array)
+        return repr([list(row) for row in self])
 
     def __len__(self):
         """Returns the length of the grid."""
-        return len(self._array)
+        return 3
 
     def __getitem__(self, index: int):
-        """Returns the element at position index of the grid."""
-        return self._array[index]
+        """Returns the row at position index of the grid."""
+        return _Row(self, index)
 
-    def __setitem__(self, index: int, value: str):
-        """Sets the element of grid at position index to value."""
-        self._array[index] = value
+    def __setitem__(self, index: int, value: list):
+        """Sets the row of grid at position index to value."""
+        for x, element in enumerate(value):
+            self.set(index, x, element)
 
     def __copy__(self):
-        """Returns a copy of a Grid object."""
-        return copy.copy(self)
-
-    def __deepcopy__(self):
-        """Returns a deepcopy of a Grid object."""
-        return copy.deepcopy(self)
+        """Returns a copy of a Grid object, viewing the same board."""
+        return Grid(board=self.board, index=self.index) if self.is_child else Grid(Grid, board=self.board)
+
+    def __deepcopy__(self, memo: dict):
+        """Returns a deepcopy of a Grid object, viewing a copy of the board."""
+        board = copy.deepcopy(self.board, memo)
+        return Grid(board=board, index=self.index) if self.is_child else Grid(Grid, board=board)
+
+    @property
+    def is_child(self) -> bool:
+        return self.index is not None
+
+    @property
+    def played(self) -> bool:
+        if self.is_child:
+            return bool(self.board.played() >> self.index & 1)
+        return self.winner is not None or self.board.played() == FULL_MASK
+
+    @property
+    def winner(self) -> Union[None, str]:
+        if not self.is_child:
+            return None if self.board.winner is None else PLAYERS[self.board.winner]
+        for player, won in zip(PLAYERS, self.board.won):
+            if won >> self.index & 1:
+                return player
+        return None
+
+    def get(self, y: int, x: int, /):
+        """Returns the element at (y, x): a child grid for the parent, a player or None for a child."""
+        if self.is_child:
+            return self.board.get(self.index * 9 + y * 3 + x)
+        return Grid(board=self.board, index=y * 3 + x)
+
+    def set(self, y: int, x: int, value: Optional[str], /):
+        """Sets the element of a child grid at (y, x) to a player or None."""
+        if not self.is_child:
+            raise TypeError("the child grids of a parent grid cannot be reassigned")
+        cell = self.index * 9 + y * 3 + x
+        self.board.remove(cell)  # a mark can be overwritten, as in the nested lists the grid used to be
+        if value is not None:
+            self.board.place(cell, PLAYERS.index(value))
 
     @staticmethod
     def get_value(value: Any, attr: Optional[str] = "winner") -> Union[bool, str, None]:
@@ -176,49 +234,35 @@ class Grid:
         Evaluates whether or not a win can be achieved in a grid.
         The value can be either 'X' or 'O', and the returned winning combination is 
         returned to show which combination won the grid (using a colour).
+        The board detects wins as moves are made, so this only reads the result.
         """
-        for combination in WIN_COMBINATIONS:
-            if all(Grid.get_value(self[position[0]][position[1]]) == value for position in combination):
-                self.played = True
-                self.winner = value
-                return combination if winning_combination else True
+        player = PLAYERS.index(value)
+        if self.is_child:
+            if not self.board.won[player] >> self.index & 1:
+                return False
+            mask = self.board.sub_cells(self.index, player)
         else:
-            return False
+            if self.board.winner != player:
+                return False
+            mask = self.board.won[player]
+        return WIN_COMBINATIONS[Board.winning_line(mask)] if winning_combination else True
 
     def draw(self) -> bool:
         """
         Evaluates whether or not a grid has been drawn. A grid is drawn if all squares
         are occupied.
         """
-        if all(Grid.get_value(value, "played") for row in self for value in row):
-            self.played = True
-            return True
-        else:
-            return False
+        if self.is_child:
+            return bool(self.board.full >> self.index & 1)
+        return self.board.played() == FULL_MASK
 
     def draw_grid(self, screen: pygame.Surface):
-        """Draws the grid on the pygame interface. Called on the parent grid."""
-        for line in GRID_LINES:
-            pygame.draw.line(screen, (200, 200, 200), line[0],
-                             line[1], 2)
-
-        for y in range(len(self)):
-            y_pos = INNER_DIMENSION * y
-            for x in range(len(self[y])):
-                x_pos = INNER_DIMENSION * x
-                if not (inner := self[y][x]).played:
-                    x_shift, y_shift = x * DIMENSION / 1.5, y * DIMENSION / 1.5
-                    for line in INNER_GRID_LINES:
-                        pygame.draw.line(screen, (200, 200, 200), _add_to_tuple(line[0], x_pos + x_shift, y_pos + y_shift),
-                                         _add_to_tuple(line[1], x_pos + x_shift, y_pos + y_shift), 2)
-                    for iy in range(len(inner)):
-                        for ix in range(len(inner[iy])):
-                            if (inner_position := inner[iy][ix]) is not None:
-                                screen.blit(SMALL_IMAGES[inner_position], (
-                                    x * DIMENSION + ix * INNER_DIMENSION, y * DIMENSION + iy * INNER_DIMENSION + Y_OFFSET))
-                else:
-                    if inner.winner is not None:
-                        screen.blit(IMAGES[inner.winner], (x * DIMENSION, y * DIMENSION + Y_OFFSET))
+        """
+        Draws the grid on the pygame interface. Called on the parent grid.
+        The game loops keep a src.renderer.BoardRenderer instead, which only redraws what has changed.
+        """
+        from src.renderer import BoardRenderer  # the renderer is built on this module
+        BoardRenderer(self.board).draw(screen)
 
     @staticmethod
     def draw_winner(winner: str, winning_combination: Combination, screen: pygame.Surface, images: Dict[str, pygame.Surface]):
@@ -250,9 +294,8 @@ class Grid:
 
     def set_coordinates(self, outer: Coordinate, inner: Coordinate, player: str, /):
         """Optimization for ComputerAI."""
-        y, x = outer
-        iy, ix = inner
-        self[y][x][iy][ix] = player
+        self.board.remove(cell := cell_index(*outer, *inner))
+        self.board.place(cell, PLAYERS.index(player))
 
     @staticmethod
     def print_grid(grid: list):
@@ -3,8 +3,11 @@ __all__ = ["MainMenu", "OptionsMenu", "PostGameMenu", "ColourMenu", "Multiplayer
 import os
 import sys
 import operator
+import functools
+from typing import List
 import pygame
-from src.graphics import Projectile, Graphics
+from src.graphics import Particles
+from src.resources import assets, SMALL
 from src.grid import ASSETS_PATH
 
 
@@ -21,25 +24,23 @@ class Menu:
         self.font_size = 30
         self.bottom_padding = 30
         self.starting_y = 30
-        self.graphics = Graphics()
+        self.particles = Particles(self.game.DISPLAY_WIDTH, self.game.DISPLAY_HEIGHT, self.game.particle_density)
 
     def draw_cursor(self):
         """Draws the cursor to the screen."""
         self.game.draw_text('–>', self.font_size, self.cursor_rect.x, self.cursor_rect.y)
 
     def blit_screen(self):
-        """Draws the display's current state to the window."""
-        self.game.window.blit(self.game.display, (0, 0))
-        pygame.display.update()
+        """Draws the regions of the display drawn on this frame (and the last) to the window."""
+        self.game.dirty.flush(self.game.window, self.game.display)
         self.game.reset_keys()
 
     def draw_graphics(self):
-        """Draws the graphics to the screen."""
-        for key, projectile in self.graphics.sections.items():
-            if projectile.y > self.game.DISPLAY_WIDTH + projectile.IMAGE.get_height():
-                self.graphics[key] = Projectile.generate(self.game.DISPLAY_WIDTH)
-            self.game.display.blit(self.graphics[key].IMAGE, self.graphics[key].get_position())
-        self.graphics.next()
+        """Draws the falling particles to the screen, unless the frame scheduler has turned animations off."""
+        if not self.game.scheduler.animations:
+            return
+        self.game.dirty.extend(self.particles.draw(self.game.display))
+        self.particles.step()
 
 
 class MainMenu(Menu):
@@ -48,16 +49,18 @@ class MainMenu(Menu):
         super().__init__(game)
         self.state = "Tutorial"
         self.play_x, self.play_y = self.mid_width, self.mid_height + self.starting_y
-        self.multiplayer_x, self.multiplayer_y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding
-        self.options_x, self.options_y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding * 2
-        self.tutorial_x, self.tutorial_y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding * 3
-        self.quit_x, self.quit_y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding * 4
+        self.computer_x, self.computer_y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding
+        self.multiplayer_x, self.multiplayer_y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding * 2
+        self.options_x, self.options_y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding * 3
+        self.tutorial_x, self.tutorial_y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding * 4
+        self.quit_x, self.quit_y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding * 5
         self.cursor_rect.midtop = (self.tutorial_x + self.offset, self.tutorial_y)
 
     def display_menu(self):
         self.run_display = True
+        self.game.dirty.invalidate()
         while self.run_display:
-            self.game.check_events()
+            self.game.check_events(self.game.scheduler.frame_timeout())
             self.check_input()
             self.game.display.fill(self.game.BLACK)
             self.draw_graphics()
@@ -66,6 +69,7 @@ class MainMenu(Menu):
             self.game.draw_text("Noughts & Crosses", 40, self.game.DISPLAY_WIDTH / 2,
                                 self.game.DISPLAY_HEIGHT / 2 - self.font_size)
             self.game.draw_text("Multiplayer", self.font_size, self.play_x, self.play_y)
+            self.game.draw_text("Versus Computer", self.font_size, self.computer_x, self.computer_y)
             self.game.draw_text("Online Multiplayer", self.font_size, self.multiplayer_x, self.multiplayer_y)
             self.game.draw_text("Options", self.font_size, self.options_x, self.options_y)
             self.game.draw_text("Tutorial", self.font_size, self.tutorial_x, self.tutorial_y)
@@ -76,6 +80,9 @@ class MainMenu(Menu):
     def move_cursor(self):
         if self.game.DOWN_KEY:
             if self.state == "Play":
+                self.cursor_rect.midtop = (self.computer_x + self.offset, self.computer_y)
+                self.state = "Computer"
+            elif self.state == "Computer":
                 self.cursor_rect.midtop = (self.multiplayer_x + self.offset, self.multiplayer_y)
                 self.state = "Multiplayer"
             elif self.state == "Multiplayer":
@@ -94,9 +101,12 @@ class MainMenu(Menu):
             if self.state == "Play":
                 self.cursor_rect.midtop = (self.quit_x + self.offset, self.quit_y)
                 self.state = "Quit"
-            elif self.state == "Multiplayer":
+            elif self.state == "Computer":
                 self.cursor_rect.midtop = (self.play_x + self.offset, self.play_y)
                 self.state = "Play"
+            elif self.state == "Multiplayer":
+                self.cursor_rect.midtop = (self.computer_x + self.offset, self.computer_y)
+                self.state = "Computer"
             elif self.state == "Options":
                 self.cursor_rect.midtop = (self.multiplayer_x + self.offset, self.multiplayer_y)
                 self.state = "Multiplayer"
@@ -110,7 +120,7 @@ class MainMenu(Menu):
     def check_input(self):
         self.move_cursor()
         if self.game.START_KEY:
-            if self.state == "Play":
+            if self.state == "Play" or self.state == "Computer":
                 self.game.playing = True
             elif self.state == "Multiplayer":
                 self.game.current_menu = self.game.multiplayer_menu
@@ -133,8 +143,9 @@ class OptionsMenu(Menu):
 
     def display_menu(self):
         self.run_display = True
+        self.game.dirty.invalidate()
         while self.run_display:
-            self.game.check_events()
+            self.game.check_events(self.game.scheduler.frame_timeout())
             self.check_input()
             self.game.display.fill(self.game.BLACK)
             self.draw_graphics()
@@ -173,8 +184,9 @@ class PostGameMenu(Menu):
 
     def display_menu(self):
         self.run_display = True
+        self.game.dirty.invalidate()
         while self.run_display:
-            self.game.check_events()
+            self.game.check_events(self.game.scheduler.frame_timeout())
             self.check_input()
             self.game.display.fill(self.game.BLACK)
             self.draw_graphics()
@@ -212,23 +224,40 @@ class ColourMenu(Menu):
         self.G_X, self.G_Y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding
         self.B_X, self.B_Y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding * 2
         self.save_x, self.save_y = self.mid_width, self.mid_height + self.starting_y + self.bottom_padding * 4
+        self.preview_y = self.save_y + self.bottom_padding * 2
         self.cursor_rect.midtop = (self.R_X + self.offset, self.R_Y)
 
+    # held arrow keys repeat after REPEAT_DELAY milliseconds, every REPEAT_INTERVAL milliseconds
+    REPEAT_DELAY, REPEAT_INTERVAL = 300, 15
+
     def display_menu(self):
         self.run_display = True
-        while self.run_display:
-            self.game.check_events()
-            self.check_input()
-            self.game.display.fill(self.game.BLACK)
-            self.draw_graphics()
-            self.game.draw_text("Change colour", 40, self.game.DISPLAY_WIDTH / 2,
-                                self.game.DISPLAY_HEIGHT / 2 - self.font_size)
-            self.game.draw_text(f"Red: {self.R}", self.font_size, self.R_X, self.R_Y)
-            self.game.draw_text(f"Green: {self.G}", self.font_size, self.G_X, self.G_Y)
-            self.game.draw_text(f"Blue: {self.B}", self.font_size, self.B_X, self.B_Y)
-            self.game.draw_text("Save", self.font_size, self.save_x, self.save_y)
-            self.draw_cursor()
-            self.blit_screen()
+        self.game.dirty.invalidate()
+        repeat = pygame.key.get_repeat()
+        pygame.key.set_repeat(self.REPEAT_DELAY, self.REPEAT_INTERVAL)
+        try:
+            while self.run_display:
+                self.game.check_events(self.game.scheduler.frame_timeout())
+                self.check_input()
+                self.game.display.fill(self.game.BLACK)
+                self.draw_graphics()
+                self.game.draw_text("Change colour", 40, self.game.DISPLAY_WIDTH / 2,
+                                    self.game.DISPLAY_HEIGHT / 2 - self.font_size)
+                self.game.draw_text(f"Red: {self.R}", self.font_size, self.R_X, self.R_Y)
+                self.game.draw_text(f"Green: {self.G}", self.font_size, self.G_X, self.G_Y)
+                self.game.draw_text(f"Blue: {self.B}", self.font_size, self.B_X, self.B_Y)
+                self.game.draw_text("Save", self.font_size, self.save_x, self.save_y)
+                self.draw_preview()
+                self.draw_cursor()
+                self.blit_screen()
+        finally:
+            pygame.key.set_repeat(*repeat)
+
+    def draw_preview(self):
+        """Draws a cross and a nought in the colour being chosen, tinting them afresh on every frame."""
+        colour = (self.R, self.G, self.B)
+        for name, x in (('X', self.mid_width - SMALL - 10), ('O', self.mid_width + 10)):
+            self.game.dirty.add(assets.blit_tinted(self.game.display, name, SMALL, (x, self.preview_y), colour))
 
     def check_input(self):
         if self.game.RIGHT_KEY or self.game.LEFT_KEY:
@@ -282,9 +311,7 @@ class ColourMenu(Menu):
                 self.cursor_rect.midtop = (self.R_X + self.offset, self.R_Y)
         if self.game.START_KEY:
             if self.state == "Save":
-                self.game.highlight = (self.R, self.G, self.B)
-                self.game.generate_highlighted_images()
-                Graphics.reload()
+                self.game.set_highlight((self.R, self.G, self.B))
                 self.game.current_menu = self.game.main_menu
             self.run_display = False
         elif self.game.BACK_KEY:
@@ -303,8 +330,9 @@ class MultiplayerMenu(Menu):
 
     def display_menu(self):
         self.run_display = True
+        self.game.dirty.invalidate()
         while self.run_display:
-            self.game.check_events()
+            self.game.check_events(self.game.scheduler.frame_timeout())
             self.check_input()
             self.game.display.fill(self.game.BLACK)
             self.draw_graphics()
@@ -353,11 +381,14 @@ def _wrap_text(string: str) -> list:
 
 
 def _get_text(filename):
-    return open(filename).read().split('\n')
+    with open(filename) as file:
+        return file.read().split('\n')
 
 
-TEXT = _get_text(os.path.join(ASSETS_PATH, 'paragraphs.txt'))
-PARAGRAPHS = list(map(_wrap_text, TEXT))
+@functools.lru_cache(maxsize=None)
+def get_paragraphs() -> List[List[List[str]]]:
+    """Returns the paragraphs of the tutorial, wrapped into lines, reading them the first time they are needed."""
+    return list(map(_wrap_text, _get_text(os.path.join(ASSETS_PATH, 'paragraphs.txt'))))
 
 
 class TutorialMenu(Menu):
@@ -372,7 +403,10 @@ class TutorialMenu(Menu):
         self.next_x = self.mid_width
         self.next_y = self.back_y + self.bottom_padding
         self.cursor_rect.midtop = (self.next_x + self.offset, self.next_y)
-        self.max_paragraph = len(PARAGRAPHS)
+
+    @property
+    def max_paragraph(self) -> int:
+        return len(get_paragraphs())
 
     def check_input(self):
         if self.game.UP_KEY or self.game.DOWN_KEY:
@@ -392,8 +426,9 @@ class TutorialMenu(Menu):
 
     def display_menu(self):
         self.run_display = True
+        self.game.dirty.invalidate()
         while self.run_display:
-            self.game.check_events()
+            self.game.check_events(self.game.scheduler.frame_timeout())
             self.check_input()
             self.game.display.fill(self.game.BLACK)
             self.draw_graphics()
@@ -405,7 +440,7 @@ class TutorialMenu(Menu):
                 return
             self.game.draw_text("Tutorial", 40, self.game.DISPLAY_WIDTH / 2,
                                 self.game.DISPLAY_HEIGHT / 4 - self.font_size)
-            for i, paragraph in enumerate(PARAGRAPHS[self.paragraph_state]):
+            for i, paragraph in enumerate(get_paragraphs()[self.paragraph_state]):
                 self.game.draw_text(' '.join(paragraph), self.font_size,
                                     self.game.DISPLAY_WIDTH / 2,
                                     self.game.DISPLAY_HEIGHT / 6 - self.offset * 2 + self.bottom_padding * i)
@@ -0,0 +1,244 @@
+"""
+The connections of online games, run on one asyncio event loop in a background thread
+"""
+
+__all__ = ["NetworkEngine", "Listener", "Session", "CLOSED", "CONNECT_TIMEOUT", "PING_INTERVAL", "IDLE_TIMEOUT"]
+
+import sys
+import queue
+import asyncio
+import threading
+from typing import Optional, Callable, List, Tuple, Awaitable, TypeVar
+from src.protocol import Message, ProtocolError, FrameDecoder, PING, PONG, encode_ping, encode_pong
+
+CLOSED = 0  # the kind of the Message queued when a session closes, with the reason as its value; never sent
+CONNECT_TIMEOUT = 5.0  # the number of seconds to wait when joining a game
+PING_INTERVAL = 5.0  # the number of seconds between pings, which keep quiet connections alive
+IDLE_TIMEOUT = 3 * PING_INTERVAL  # the number of seconds without hearing from the other player before giving up
+# the number of seconds a thread may hold the GIL while another waits for it, while the engine runs: by default
+# (5ms) a message which arrives while the game is drawing a frame waits that long to be read off the socket
+SWITCH_INTERVAL = 0.001
+LEFT = "The other player has left"
+
+Result = TypeVar("Result")
+
+
+class Session:
+    """
+    A connection to another player. Its frames are read on the engine's loop, which answers pings itself
+    and queues every other message for the game, then calls the engine's notify function.
+    receive, send and close may be called from any thread; nothing else about a session is shared.
+
+    Attributes
+    ----------
+    engine : NetworkEngine
+        the engine running the session
+    address : tuple
+        the address of the other player
+    inbox : queue.SimpleQueue[src.protocol.Message]
+        the messages received and not yet taken by receive, ending with a CLOSED message
+    closed : bool
+        whether the connection has closed, on either side
+    """
+
+    __slots__ = "engine", "address", "inbox", "closed", "_reader", "_writer", "_task"
+
+    def __init__(self, engine: "NetworkEngine", reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.engine = engine
+        self.address = writer.get_extra_info("peername")
+        self.inbox: "queue.SimpleQueue[Message]" = queue.SimpleQueue()
+        self.closed = False
+        self._reader, self._writer = reader, writer
+        self._task = asyncio.ensure_future(self._run())
+
+    def __repr__(self):
+        return f"Session(address={self.address}, closed={self.closed})"
+
+    def receive(self) -> List[Message]:
+        """Returns the messages received since the last call, without waiting."""
+        messages = []
+        while True:
+            try:
+                messages.append(self.inbox.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def send(self, data: bytes, /):
+        """Sends a frame (see src.protocol) to the other player, unless the session has closed."""
+        if not self.closed:
+            self.engine.call(self._write, data)
+
+    def close(self, farewell: bytes = b"", /):
+        """Sends farewell, if given, then closes the connection. No CLOSED message is queued for closing it here."""
+        if not self.closed:
+            self.closed = True
+            self.engine.call(self._close, farewell)
+
+    def _write(self, data: bytes, /):
+        if not self._writer.is_closing():
+            self._writer.write(data)
+
+    def _close(self, farewell: bytes, /):
+        self._write(farewell)
+        self._task.cancel()
+
+    def _deliver(self, message: Message, /):
+        self.inbox.put(message)
+        self.engine.notify()
+
+    async def _ping(self):
+        nonce = 0
+        while True:
+            await asyncio.sleep(PING_INTERVAL)
+            self._write(encode_ping(nonce := nonce + 1 & 0xFFFFFFFF))
+
+    async def _run(self):
+        decoder = FrameDecoder()
+        pinger = asyncio.ensure_future(self._ping())
+        reason: Optional[str] = LEFT
+        try:
+            while data := await asyncio.wait_for(self._reader.read(4096), IDLE_TIMEOUT):
+                for message in decoder.feed(data):
+                    if message.kind == PING:
+                        self._write(encode_pong(message.value))
+                    elif message.kind != PONG:
+                        self._deliver(message)
+        except asyncio.TimeoutError:
+            reason = "The connection has timed out"
+        except ProtocolError:
+            reason = "The other player sent an invalid move"
+        except OSError:
+            pass
+        except asyncio.CancelledError:
+            reason = None  # closed on this side
+        finally:
+            pinger.cancel()
+            self._writer.close()
+            if reason is not None and not self.closed:
+                self.closed = True
+                self._deliver(Message(CLOSED, reason))
+
+
+class Listener:
+    """
+    Accepts connections on a port, queueing a Session for each of them until it is closed.
+    A game takes the first session and closes the listener; a server can keep accepting any number.
+
+    Attributes
+    ----------
+    engine : NetworkEngine
+        the engine running the listener
+    sessions : queue.SimpleQueue[Session]
+        the sessions accepted and not yet taken by accept
+    """
+
+    __slots__ = "engine", "sessions", "_server"
+
+    def __init__(self, engine: "NetworkEngine"):
+        self.engine = engine
+        self.sessions: "queue.SimpleQueue[Session]" = queue.SimpleQueue()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def address(self) -> Tuple:
+        """The address the listener is accepting connections on."""
+        return self._server.sockets[0].getsockname()
+
+    def accept(self) -> Optional[Session]:
+        """Returns the next session accepted, or None if there are none waiting."""
+        try:
+            return self.sessions.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Stops accepting connections. Sessions already accepted stay open."""
+        if self._server is not None:
+            self.engine.call(self._server.close)
+
+    def _accepted(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, /):
+        self.sessions.put(Session(self.engine, reader, writer))
+        self.engine.notify()
+
+
+class NetworkEngine:
+    """
+    Runs an asyncio event loop in a daemon thread, started when it is first needed, on which
+    every listener and session runs. The game's loop talks to it only through the methods of
+    Listener and Session, and is woken by notify whenever a connection or message arrives.
+
+    Attributes
+    ----------
+    notify : Callable[[], None]
+        called on the engine's thread whenever something has been queued for the game
+    loop : asyncio.AbstractEventLoop | None
+        the engine's event loop, once it has started
+    """
+
+    __slots__ = "notify", "loop", "_thread", "_lock", "_switch_interval"
+
+    def __init__(self, notify: Optional[Callable[[], None]] = None):
+        self.notify = notify if notify is not None else lambda: None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._switch_interval = sys.getswitchinterval()
+
+    def start(self):
+        """Starts the event loop, if it is not already running, and shortens the switch interval until it stops."""
+        with self._lock:
+            if self.loop is None:
+                self._switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(self._switch_interval, SWITCH_INTERVAL))
+                self.loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self.loop.run_forever, name="network", daemon=True)
+                self._thread.start()
+
+    def run(self, coroutine: Awaitable[Result], /, timeout: Optional[float] = None) -> Result:
+        """Runs a coroutine on the engine's loop, waiting for its result (and raising its exception)."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def call(self, function: Callable, /, *args):
+        """Calls a function on the engine's loop, without waiting for it."""
+        self.start()
+        self.loop.call_soon_threadsafe(function, *args)
+
+    def listen(self, host: str, port: int, /, backlog: int = 1024) -> Listener:
+        """
+        Starts accepting connections on host and port, queueing up to backlog connections which have not been
+        accepted yet (a server being joined by many players at once needs a long queue). Raises OSError if
+        they cannot be listened on.
+        """
+        async def listen() -> Listener:
+            listener._server = await asyncio.start_server(listener._accepted, host, port, backlog=backlog)
+            return listener
+
+        listener = Listener(self)
+        return self.run(listen())
+
+    def connect(self, host: str, port: int, /, timeout: float = CONNECT_TIMEOUT) -> Session:
+        """Joins the game at host and port. Raises OSError if it cannot, or asyncio.TimeoutError after timeout seconds."""
+        async def connect() -> Session:
+            return Session(self, *await asyncio.wait_for(asyncio.open_connection(host, port), timeout))
+
+        return self.run(connect())
+
+    def stop(self):
+        """Stops the event loop, closing every connection, and waits for its thread to finish."""
+        with self._lock:
+            if self.loop is None:
+                return
+            loop, thread, self.loop, self._thread = self.loop, self._thread, None, None
+
+        async def shutdown():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        sys.setswitchinterval(self._switch_interval)
@@ -0,0 +1,115 @@
+"""
+The messages online games send, framed so that they can be read back from a stream of bytes
+"""
+
+__all__ = ["VERSION", "MOVE", "RESIGN", "PING", "PONG", "STATE_SYNC", "Message", "ProtocolError", "FrameDecoder",
+           "encode", "encode_move", "encode_resign", "encode_ping", "encode_pong", "encode_state"]
+
+import struct
+from typing import NamedTuple, Union, Optional, List, Iterable
+
+# every frame is a big-endian header of the number of bytes which follow it (the rest of the header
+# and the payload), the version of the protocol and the type of the message, then the payload
+HEADER = struct.Struct("!HBB")
+LENGTH = struct.Struct("!H")
+NONCE = struct.Struct("!I")
+VERSION = 1
+# the types of message: a move, as its cell (see src.board.cell_index) in one byte; the sender leaving the game;
+# a ping, answered by a pong carrying the same 32-bit nonce; and every move of the game so far, one byte each
+MOVE, RESIGN, PING, PONG, STATE_SYNC = range(1, 6)
+_PAYLOAD_SIZES = {MOVE: 1, RESIGN: 0, PING: NONCE.size, PONG: NONCE.size}  # STATE_SYNC payloads vary in size
+MAX_PAYLOAD = 0xFFFF - (HEADER.size - LENGTH.size)
+
+
+class ProtocolError(ValueError):
+    """Raised when a frame received is not valid, after which the rest of the stream cannot be trusted."""
+
+
+class Message(NamedTuple):
+    kind: int
+    value: Union[int, bytes, None] = None  # the cell of a MOVE, the nonce of a PING or PONG, the moves of a STATE_SYNC
+
+
+def encode(kind: int, payload: bytes = b"", /) -> bytes:
+    """Returns the frame of a message with the given payload."""
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"payloads are at most {MAX_PAYLOAD} bytes, not {len(payload)}")
+    return HEADER.pack(HEADER.size - LENGTH.size + len(payload), VERSION, kind) + payload
+
+
+def encode_move(cell: int, /) -> bytes:
+    return encode(MOVE, bytes((cell,)))
+
+
+def encode_resign() -> bytes:
+    return encode(RESIGN)
+
+
+def encode_ping(nonce: int, /) -> bytes:
+    return encode(PING, NONCE.pack(nonce))
+
+
+def encode_pong(nonce: int, /) -> bytes:
+    return encode(PONG, NONCE.pack(nonce))
+
+
+def encode_state(moves: Iterable[int], /) -> bytes:
+    return encode(STATE_SYNC, bytes(moves))
+
+
+class FrameDecoder:
+    """
+    Splits a stream of bytes into messages, however the stream was split into segments:
+    a frame may arrive across several calls to feed, and several frames in one.
+    Headers and payloads are read through a memoryview of the buffer, without copying.
+
+    Attributes
+    ----------
+    buffer : bytearray
+        the bytes received which have not yet formed a whole frame
+    """
+
+    __slots__ = "buffer",
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data: Union[bytes, bytearray, memoryview], /) -> List[Message]:
+        """Adds bytes received from the stream and returns the messages they complete, in order."""
+        self.buffer += data
+        messages = []
+        offset = 0
+        with memoryview(self.buffer) as view:
+            while (message := self._parse(view, offset)) is not None:
+                messages.append(message[0])
+                offset = message[1]
+        del self.buffer[:offset]
+        return messages
+
+    @staticmethod
+    def _parse(view: memoryview, offset: int, /) -> Optional[tuple]:
+        """Returns the message in the frame starting at offset and the offset after it, or None if it is incomplete."""
+        if len(view) - offset < HEADER.size:
+            return None
+        length, version, kind = HEADER.unpack_from(view, offset)
+        if version != VERSION:  # checked before waiting for the payload, in case length is nonsense too
+            raise ProtocolError(f"version {version} of the protocol is not supported")
+        if length < HEADER.size - LENGTH.size:
+            raise ProtocolError(f"a frame of {length} bytes is too short to hold its header")
+        if len(view) < (end := offset + LENGTH.size + length):
+            return None
+        start = offset + HEADER.size
+        size = end - start
+        if (expected := _PAYLOAD_SIZES.get(kind, size if kind == STATE_SYNC else None)) is None:
+            raise ProtocolError(f"unknown type of message {kind}")
+        if size != expected:
+            raise ProtocolError(f"a message of type {kind} has {size} bytes of payload, not {expected}")
+        if kind == MOVE:
+            if (cell := view[start]) >= 81:
+                raise ProtocolError(f"{cell} is not a cell")
+            return Message(kind, cell), end
+        if kind in (PING, PONG):
+            return Message(kind, NONCE.unpack_from(view, start)[0]), end
+        if kind == STATE_SYNC:
+            return Message(kind, view[start:end].tobytes()), end
+        return Message(kind), end
@@ -0,0 +1,113 @@
+"""
+Draws the board from pre-rendered layers, redrawing only the sub-boards that have changed
+"""
+
+__all__ = ["BoardRenderer"]
+
+from typing import Optional, List, Tuple
+import pygame
+from src.board import Board, PLAYERS
+from src.resources import assets, LARGE, SMALL
+from src.grid import DIMENSION, INNER_DIMENSION, Y_OFFSET, GRID_LINES, INNER_GRID_LINES
+
+LINE_COLOUR = (200, 200, 200)
+BOARD_SIZE = int(DIMENSION * 3)
+# the static layers every sub-board is drawn over: the lines of the open and played sub-boards
+_layers: Optional[Tuple[pygame.Surface, pygame.Surface]] = None
+
+
+def _draw_lines(surface: pygame.Surface, lines, x: float, y: float, /):
+    for start, end in lines:
+        pygame.draw.line(surface, LINE_COLOUR, (start[0] + x, start[1] + y), (end[0] + x, end[1] + y), 2)
+
+
+def _get_layers() -> Tuple[pygame.Surface, pygame.Surface]:
+    """Returns the layer of lines of open sub-boards and the layer of lines of played ones, drawing them once."""
+    global _layers
+    if _layers is None:
+        played = pygame.Surface((BOARD_SIZE, BOARD_SIZE))
+        _draw_lines(played, GRID_LINES, 0, -Y_OFFSET)
+        open_ = played.copy()
+        for sub in range(9):
+            y, x = divmod(sub, 3)
+            _draw_lines(open_, INNER_GRID_LINES, x * DIMENSION, y * DIMENSION - Y_OFFSET)
+        _layers = open_, played
+    return _layers
+
+
+class BoardRenderer:
+    """
+    Keeps a picture of a Board on a surface of its own, so drawing the board costs a single blit.
+    When the board changes, only the sub-boards whose cells or result changed are redrawn,
+    by copying their region of a static layer of grid lines and blitting their marks over it.
+
+    Attributes
+    ----------
+    board : Board
+        the board being drawn
+    surface : pygame.Surface
+        the picture of the board, drawn at (0, Y_OFFSET) on the window
+    drawn : list[tuple[int, int, int]]
+        for each sub-board, the cells of each player and the winner (or -1) when it was last drawn
+    """
+
+    __slots__ = "board", "surface", "drawn"
+
+    def __init__(self, board: Board, /):
+        self.board = board
+        self.surface = pygame.Surface((BOARD_SIZE, BOARD_SIZE))
+        self.drawn: List[Optional[Tuple[int, int, int]]] = [None] * 9
+
+    @staticmethod
+    def sub_rect(sub: int, /) -> pygame.Rect:
+        """Returns the region of a sub-board on the renderer's surface."""
+        y, x = divmod(sub, 3)
+        return pygame.Rect(int(x * DIMENSION), int(y * DIMENSION), int(DIMENSION), int(DIMENSION))
+
+    def update(self) -> List[pygame.Rect]:
+        """Redraws the sub-boards which have changed since they were last drawn and returns their regions on the window."""
+        board, changed = self.board, []
+        played = board.played()
+        for sub in range(9):
+            winner = -1
+            if played >> sub & 1:
+                winner = next((player for player in range(2) if board.won[player] >> sub & 1), 2)
+            key = board.sub_cells(sub, 0), board.sub_cells(sub, 1), winner
+            if self.drawn[sub] != key:
+                self.drawn[sub] = key
+                self.draw_sub(sub, *key)
+                changed.append(self.sub_rect(sub).move(0, Y_OFFSET))
+        return changed
+
+    def draw_sub(self, sub: int, x_cells: int, o_cells: int, winner: int, /):
+        """Draws a sub-board: its marks if it is open (winner is -1), or the image of its winner if it has one."""
+        open_layer, played_layer = _get_layers()
+        rect = self.sub_rect(sub)
+        self.surface.blit(played_layer if winner >= 0 else open_layer, rect, rect)
+        if winner < 0:
+            marks = []
+            for inner in range(9):
+                for player, cells in zip(PLAYERS, (x_cells, o_cells)):
+                    if cells >> inner & 1:
+                        iy, ix = divmod(inner, 3)
+                        marks.append((player, SMALL, (rect.x + ix * INNER_DIMENSION, rect.y + iy * INNER_DIMENSION)))
+            assets.blits(self.surface, marks)
+        elif winner < 2:
+            assets.blit(self.surface, PLAYERS[winner], LARGE, rect.topleft)
+
+    def invalidate(self):
+        """Makes the next update redraw every sub-board."""
+        self.drawn = [None] * 9
+
+    def draw(self, screen: pygame.Surface, /) -> List[pygame.Rect]:
+        """Brings the picture up to date and blits it to screen. Returns the regions which changed."""
+        changed = self.update()
+        screen.blit(self.surface, (0, Y_OFFSET))
+        return changed
+
+    def draw_changes(self, screen: pygame.Surface, /) -> List[pygame.Rect]:
+        """Brings the picture up to date and blits only the sub-boards which changed to screen. Returns their regions."""
+        changed = self.update()
+        for rect in changed:
+            screen.blit(self.surface, rect, rect.move(0, -Y_OFFSET))
+        return changed
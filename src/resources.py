@@ -0,0 +1,145 @@
+"""
+Loads the sprites once, in the display's pixel format, packed into a single atlas
+"""
+
+__all__ = ["AssetManager", "assets", "LARGE", "SMALL", "SPRITE_NAMES", "tint_cache"]
+
+import hashlib
+import io
+import os
+from typing import Optional, Dict, Tuple, List, Iterable
+import pygame
+from src.cache import FileCache
+from src.grid import ASSETS_PATH, DIMENSION, tint
+
+LARGE, SMALL = int(DIMENSION), 66  # the sizes of the sprites: a whole sub-board, and one of its cells
+# the sprites of each player, plain and in the highlight colour (prefixed with C)
+SPRITE_NAMES = ('X', 'O', 'CX', 'CO')
+# the file each plain sprite is loaded from, for each size
+_FILES = {
+    LARGE: {'X': "X.png", 'O': "O.png"},
+    SMALL: {'X': "IX.png", 'O': "IO.png"},
+}
+Colour = Tuple[int, int, int]
+SpriteKey = Tuple[str, int]
+# the highlighted sprites of each colour, as raw RGBA pixels, keyed by the colour and the files they were tinted from
+tint_cache = FileCache("tints")
+
+
+class AssetManager:
+    """
+    Packs every sprite (X and O, plain and highlighted, at both sizes) into one surface,
+    converted to the pixel format of the display so that blits need no conversion.
+    Sprites are drawn by blitting a region of the atlas, and many at once with Surface.blits.
+    The atlas is built the first time it is needed, which must be after the display is set up.
+    The highlighted sprites are tinted from the plain ones in memory, and cached in tint_cache
+    so that colours which have been used before are loaded instead of tinted again.
+
+    Attributes
+    ----------
+    highlight : tuple[int, int, int]
+        the colour of the highlighted sprites
+    atlas : pygame.Surface | None
+        every sprite, large ones along the first row and small ones along the second
+    rects : dict[tuple[str, int], pygame.Rect]
+        the region of the atlas holding each sprite, keyed by (name, size)
+    """
+
+    __slots__ = "highlight", "atlas", "rects", "_subsurfaces", "_source_digest", "_scratch"
+
+    def __init__(self, highlight: Colour = (255, 0, 0)):
+        self.highlight = highlight
+        self.atlas: Optional[pygame.Surface] = None
+        self.rects: Dict[SpriteKey, pygame.Rect] = {}
+        self._subsurfaces: Dict[SpriteKey, pygame.Surface] = {}
+        self._source_digest = b""
+        self._scratch: Dict[SpriteKey, pygame.Surface] = {}
+
+    def load(self):
+        """Builds the atlas from the files in ASSETS_PATH."""
+        self.atlas = pygame.Surface((LARGE * len(SPRITE_NAMES), LARGE + SMALL), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            self.atlas = self.atlas.convert_alpha()
+        self.rects.clear()
+        self._subsurfaces.clear()
+        self._scratch.clear()
+        for column, name in enumerate(SPRITE_NAMES):
+            self.rects[name, LARGE] = pygame.Rect(column * LARGE, 0, LARGE, LARGE)
+            self.rects[name, SMALL] = pygame.Rect(column * LARGE, LARGE, SMALL, SMALL)
+        digest = hashlib.sha256()
+        for size, files in _FILES.items():
+            for name, file in files.items():
+                with open(os.path.join(ASSETS_PATH, file), "rb") as source:
+                    data = source.read()
+                digest.update(data)
+                self._put(name, size, pygame.image.load(io.BytesIO(data), file))
+        self._source_digest = digest.digest()
+        self._draw_highlight()
+
+    def set_highlight(self, colour: Colour, /):
+        """Changes the colour of the highlighted sprites, tinting them again if the atlas has been built."""
+        self.highlight = tuple(colour)
+        if self.atlas is not None:
+            self._draw_highlight()
+
+    def _put(self, name: str, size: int, image: pygame.Surface, /):
+        rect = self.rects[name, size]
+        self.atlas.fill((0, 0, 0, 0), rect)
+        # adding onto transparent pixels copies the image exactly, where blending would darken its edges
+        self.atlas.blit(image, rect, special_flags=pygame.BLEND_RGBA_ADD)
+
+    def _draw_highlight(self):
+        sprites = [(name, size) for name in ('X', 'O') for size in (LARGE, SMALL)]
+        key = tint_cache.key(b"tint-v1", self._source_digest, bytes(self.highlight))
+        if (data := tint_cache.get(key)) is not None and len(data) == sum(size * size * 4 for _, size in sprites):
+            offset = 0
+            for name, size in sprites:
+                self._put('C' + name, size, pygame.image.frombuffer(data[offset:offset + size * size * 4], (size, size), "RGBA"))
+                offset += size * size * 4
+            return
+        tinted = [tint(self.atlas.subsurface(self.rects[name, size]), self.highlight) for name, size in sprites]
+        for (name, size), image in zip(sprites, tinted):
+            self._put('C' + name, size, image)
+        tint_cache.put(key, b"".join(pygame.image.tostring(image, "RGBA") for image in tinted))
+
+    def sprite(self, name: str, size: int = LARGE, /) -> Tuple[pygame.Surface, pygame.Rect]:
+        """Returns the atlas and the region of it holding a sprite, to be passed to Surface.blit."""
+        if self.atlas is None:
+            self.load()
+        return self.atlas, self.rects[name, size]
+
+    def surface(self, name: str, size: int = LARGE, /) -> pygame.Surface:
+        """Returns a sprite as a subsurface of the atlas, which changes along with it."""
+        if (surface := self._subsurfaces.get(key := (name, size))) is None:
+            atlas, rect = self.sprite(name, size)
+            surface = self._subsurfaces[key] = atlas.subsurface(rect)
+        return surface
+
+    def blit(self, target: pygame.Surface, name: str, size: int, position: Tuple[float, float], /) -> pygame.Rect:
+        """Draws a sprite onto target and returns the region drawn."""
+        atlas, rect = self.sprite(name, size)
+        return target.blit(atlas, position, rect)
+
+    def blit_tinted(self, target: pygame.Surface, name: str, size: int, position: Tuple[float, float],
+                    colour: Colour, /) -> pygame.Rect:
+        """
+        Draws a plain sprite in colour onto target and returns the region drawn. The plain sprites are
+        white, so multiplying one by the colour tints it, which is cheap enough to do on every frame.
+        """
+        atlas, rect = self.sprite(name, size)
+        if (scratch := self._scratch.get(key := (name, size))) is None:
+            scratch = self._scratch[key] = pygame.Surface(rect.size, pygame.SRCALPHA, atlas)
+        scratch.fill((0, 0, 0, 0))
+        scratch.blit(atlas, (0, 0), rect, special_flags=pygame.BLEND_RGBA_ADD)
+        scratch.fill((*colour, 255), special_flags=pygame.BLEND_RGBA_MULT)
+        return target.blit(scratch, position)
+
+    def blits(self, target: pygame.Surface, sprites: Iterable[Tuple[str, int, Tuple[float, float]]], /) -> List[pygame.Rect]:
+        """Draws many sprites, given as (name, size, position), onto target in one call and returns the regions drawn."""
+        if self.atlas is None:
+            self.load()
+        atlas, rects = self.atlas, self.rects
+        return target.blits([(atlas, position, rects[name, size]) for name, size, position in sprites]) or []
+
+
+assets = AssetManager()  # shared by everything which draws sprites
@@ -0,0 +1,138 @@
+"""
+Paces the frames of the game's loops, putting them to sleep until there is something to do
+"""
+
+__all__ = ["FrameScheduler", "NETWORK_EVENT", "post_network_event"]
+
+import time
+from collections import deque
+from typing import Optional, List, Deque, Iterable
+import pygame
+
+NETWORK_EVENT = pygame.event.custom_type()  # posted by the network threads whenever something arrives
+
+
+def post_network_event(**attributes):
+    """Wakes the game's loop from another thread. Events can be posted from any thread."""
+    pygame.event.post(pygame.event.Event(NETWORK_EVENT, attributes))
+
+
+def _percentile(values: Iterable[float], percent: float, /) -> float:
+    """Returns the given percentile of values (the nearest rank at or above it), or 0 if there are none."""
+    if not (ordered := sorted(values)):
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class FrameScheduler:
+    """
+    Hands the game's loops their events and paces their frames.
+    Each call to wait ends a frame: loops with an animation wait until the next frame is due
+    (see frame_timeout) and loops with nothing to animate sleep until an event arrives:
+    input, or a NETWORK_EVENT. Mouse motion is blocked, since no loop uses it and it would
+    wake them constantly.
+    The time spent working on each frame (not sleeping, and not presenting it, which blocks until the
+    monitor refreshes when vsync is on) is measured: see end_work. When recent frames take
+    longer than the budget, the governor turns animations off until frames take less than
+    half of it again. Each time animations have to be turned off again soon after being turned
+    back on, they are kept off for twice as long, so the governor does not flicker between the two.
+
+    Attributes
+    ----------
+    target_fps : int | None
+        the number of frames per second animations run at, or None to run them as fast as possible
+    budget : float
+        the number of seconds a frame may take before animations are turned off
+    animations : bool
+        whether loops should draw their animations, as decided by the governor
+    frame_times : collections.deque[float]
+        the number of seconds spent working on each recent frame
+    waits : int
+        the number of times a loop has been put to sleep
+    idle_time : float
+        the total number of seconds the loops have slept for
+    """
+
+    __slots__ = ("target_fps", "budget", "animations", "frame_times", "waits", "idle_time", "_frame_start",
+                 "_work_end", "_strikes", "_hold", "_stable")
+
+    GOVERNOR_FRAMES = 30  # the number of recent frames the governor looks at
+
+    def __init__(self, target_fps: Optional[int] = 60, budget: Optional[float] = None, history: int = 600):
+        pygame.event.set_blocked(pygame.MOUSEMOTION)
+        self.target_fps = target_fps
+        self.budget = budget if budget is not None else 1 / (target_fps or 60)
+        self.animations = True
+        self.frame_times: Deque[float] = deque(maxlen=history)
+        self.waits = 0
+        self.idle_time = 0.0
+        self._frame_start: Optional[float] = None
+        self._work_end: Optional[float] = None
+        self._strikes = self._hold = self._stable = 0
+
+    @property
+    def frame_interval(self) -> float:
+        """The number of seconds between the frames of an animation."""
+        return 1 / self.target_fps if self.target_fps else 0.0
+
+    def frame_timeout(self) -> float:
+        """Returns the number of seconds until the next frame of an animation is due."""
+        if self._frame_start is None:
+            return 0.0
+        return max(0.0, self._frame_start + self.frame_interval - time.perf_counter())
+
+    def percentile(self, percent: float, /) -> float:
+        """Returns the given percentile of the recent frame times, in seconds."""
+        return _percentile(self.frame_times, percent)
+
+    def report(self) -> str:
+        """Returns the statistics of the recent frames."""
+        return (f"{len(self.frame_times)} frames, frame time p50 {self.percentile(50) * 1000:.2f}ms, "
+                f"p95 {self.percentile(95) * 1000:.2f}ms, p99 {self.percentile(99) * 1000:.2f}ms, "
+                f"animations {'on' if self.animations else 'off'}")
+
+    def end_work(self):
+        """
+        Stops timing the current frame, just before it is presented. Frames which are not presented
+        (or whose loops do not call this) are timed until wait is called.
+        """
+        if self._frame_start is not None and self._work_end is None:
+            self._work_end = time.perf_counter()
+
+    def wait(self, timeout: Optional[float] = None, /) -> List[pygame.event.Event]:
+        """
+        Ends the current frame and returns the pending events. If there are none, first sleeps
+        until one arrives or until timeout seconds have passed (forever if timeout is None).
+        """
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.frame_times.append((now if self._work_end is None else self._work_end) - self._frame_start)
+            self._work_end = None
+            self._govern()
+        events = pygame.event.get()
+        if not events and (timeout is None or timeout > 0):
+            event = pygame.event.wait() if timeout is None else pygame.event.wait(max(1, round(timeout * 1000)))
+            self.waits += 1
+            self.idle_time += time.perf_counter() - now
+            if event.type != pygame.NOEVENT:
+                events = [event, *pygame.event.get()]
+        self._frame_start = time.perf_counter()
+        return events
+
+    def _govern(self):
+        recent = list(self.frame_times)[-self.GOVERNOR_FRAMES:]
+        slowest = _percentile(recent, 95) if len(recent) >= self.GOVERNOR_FRAMES else 0.0
+        if self.animations:
+            if slowest > self.budget:
+                self.animations = False
+                self._hold = self.GOVERNOR_FRAMES << min(self._strikes, 5)
+                self._strikes += 1
+            else:
+                self._stable += 1
+                if self._stable >= self.GOVERNOR_FRAMES * 10:  # animations have been kept up for a while
+                    self._strikes = 0
+        elif self._hold:
+            self._hold -= 1
+        elif slowest < self.budget / 2:
+            self.animations = True
+            self._stable = 0
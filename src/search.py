@@ -0,0 +1,229 @@
+"""
+A deterministic alpha-beta searcher, used for analysis and as a benchmark of the rules engine
+"""
+
+__all__ = ["AlphaBeta", "TranspositionTable", "evaluate"]
+
+import sys
+import time
+from functools import lru_cache
+from typing import Optional, List, Tuple
+from src.board import LINE_MASKS
+from src.state import GameState, ONGOING, DRAWN
+
+WIN_SCORE = 1_000_000
+_MATE_BOUND = WIN_SCORE - 100  # scores beyond this are wins, adjusted by the number of moves to reach them
+EXACT, LOWER, UPPER = 0, 1, 2
+_CENTRE, _CORNERS = 4, (0, 2, 6, 8)
+
+
+@lru_cache(maxsize=None)
+def _grid_score(mine: int, theirs: int, blocked: int = 0) -> int:
+    """Scores a 3x3 grid from the point of view of the owner of mine: open pairs and the centre."""
+    score = 0
+    for line in LINE_MASKS:
+        if blocked & line:
+            continue
+        if not theirs & line and bin(mine & line).count('1') == 2:
+            score += 3
+        elif not mine & line and bin(theirs & line).count('1') == 2:
+            score -= 3
+    score += (mine >> _CENTRE & 1) - (theirs >> _CENTRE & 1)
+    return score
+
+
+def evaluate(state: GameState, /) -> int:
+    """Returns a heuristic score of a position from the point of view of the player to move."""
+    board, player = state.board, state.to_move
+    mine_won, theirs_won = board.won[player], board.won[player ^ 1]
+    drawn = board.full & ~(mine_won | theirs_won)
+    score = 20 * _grid_score(mine_won, theirs_won, drawn)
+    score += 25 * (bin(mine_won).count('1') - bin(theirs_won).count('1'))
+    played = board.played()
+    for sub in range(9):
+        if not played >> sub & 1:
+            weight = 3 if sub == _CENTRE else 2 if sub in _CORNERS else 1
+            score += weight * _grid_score(board.sub_cells(sub, player), board.sub_cells(sub, player ^ 1))
+    return score
+
+
+class _Timeout(Exception):
+    pass
+
+
+class TranspositionTable:
+    """
+    A fixed-size table of search results indexed by the low bits of the Zobrist hash.
+    An entry is replaced by a result searched at least as deeply, or by any result once the entry
+    is left over from an earlier search.
+
+    Attributes
+    ----------
+    probes : int
+        the number of lookups made
+    hits : int
+        the number of lookups which found an entry for the same position
+    """
+
+    __slots__ = "mask", "keys", "entries", "generation", "probes", "hits"
+
+    def __init__(self, size: int = 1 << 18):
+        if size & (size - 1):
+            raise ValueError("the size of a transposition table must be a power of two")
+        self.mask = size - 1
+        self.keys: List[Optional[int]] = [None] * size
+        # (depth, value, flag, move, generation) of each entry
+        self.entries: List[Optional[Tuple[int, int, int, Optional[int], int]]] = [None] * size
+        self.generation = 0
+        self.probes = self.hits = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    def new_search(self):
+        """Marks every entry as belonging to an earlier search and resets the statistics."""
+        self.generation += 1
+        self.probes = self.hits = 0
+
+    def probe(self, key: int, /) -> Optional[Tuple[int, int, int, Optional[int], int]]:
+        """Returns the entry stored for the position with hash key, if there is one."""
+        self.probes += 1
+        index = key & self.mask
+        if self.keys[index] == key:
+            self.hits += 1
+            return self.entries[index]
+        return None
+
+    def store(self, key: int, depth: int, value: int, flag: int, move: Optional[int], /):
+        index = key & self.mask
+        entry = self.entries[index]
+        if entry is None or self.keys[index] == key or entry[4] != self.generation or depth >= entry[0]:
+            self.keys[index] = key
+            self.entries[index] = (depth, value, flag, move, self.generation)
+
+
+class AlphaBeta:
+    """
+    A negamax alpha-beta searcher with iterative deepening and a transposition table.
+    Moves are ordered with the best move from the table first, then by the history heuristic.
+
+    Attributes
+    ----------
+    max_depth : int
+        the deepest iteration to search to
+    time_limit : float | None
+        the number of seconds to search for per move; the last completed iteration is used
+    table : TranspositionTable
+        the transposition table, kept between searches
+    nodes : int
+        the number of positions visited by the last search
+    depth : int
+        the deepest iteration completed by the last search
+    score : int
+        the score of the last search from the point of view of the player to move
+    elapsed : float
+        the number of seconds the last search took
+    """
+
+    def __init__(self, max_depth: int = 64, time_limit: Optional[float] = 1.0, table_size: int = 1 << 18):
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.table = TranspositionTable(table_size)
+        self.history = [[0] * 81, [0] * 81]
+        self.nodes = self.depth = self.score = 0
+        self.elapsed = 0.0
+        self._deadline: Optional[float] = None
+        self._root_move: Optional[int] = None
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def report(self) -> str:
+        """Returns the statistics of the last search."""
+        return (f"depth {self.depth}, score {self.score}, {self.nodes} nodes in {self.elapsed:.2f}s "
+                f"({self.nodes_per_second:.0f}/s), table hit rate {self.table.hit_rate:.1%}")
+
+    def choose_move(self, state: GameState, /) -> int:
+        """Searches from state and returns the best move found. The state is restored before returning."""
+        moves = state.legal_moves()
+        if not moves:
+            raise ValueError("the game is over")
+        start = time.perf_counter()
+        self._deadline = None if self.time_limit is None else start + self.time_limit
+        self.table.new_search()
+        self.history = [[0] * 81, [0] * 81]
+        self.nodes = self.depth = 0
+        best_move, moves_made = moves[0], len(state.history)
+        for depth in range(1, self.max_depth + 1):
+            try:
+                self.score = self._negamax(state, depth, -WIN_SCORE, WIN_SCORE, 0)
+            except _Timeout:
+                while len(state.history) > moves_made:
+                    state.undo()
+                break
+            self.depth = depth
+            best_move = self._root_move
+            if abs(self.score) > _MATE_BOUND or depth >= 81 - moves_made:
+                break
+        self.elapsed = time.perf_counter() - start
+        return best_move
+
+    def _negamax(self, state: GameState, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise _Timeout
+        if (status := state.status()) != ONGOING:
+            return 0 if status == DRAWN else ply - WIN_SCORE  # the player who just moved has won
+        if depth == 0:
+            return evaluate(state)
+
+        original_alpha, table_move = alpha, None
+        if (entry := self.table.probe(state.hash)) is not None:
+            entry_depth, value, flag, table_move, _ = entry
+            if entry_depth >= depth and ply:
+                value = value - ply if value > _MATE_BOUND else value + ply if value < -_MATE_BOUND else value
+                if flag == EXACT:
+                    return value
+                elif flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        history = self.history[state.to_move]
+        moves = sorted(state.legal_moves(), key=lambda move: history[move], reverse=True)
+        if table_move in moves:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+        best_value, best_move = -WIN_SCORE - 1, moves[0]
+        for move in moves:
+            state.apply(move)
+            value = -self._negamax(state, depth - 1, -beta, -alpha, ply + 1)
+            state.undo()
+            if value > best_value:
+                best_value, best_move = value, move
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                history[move] += depth * depth
+                break
+
+        flag = UPPER if best_value <= original_alpha else LOWER if best_value >= beta else EXACT
+        stored = best_value + ply if best_value > _MATE_BOUND else best_value - ply if best_value < -_MATE_BOUND else best_value
+        self.table.store(state.hash, depth, stored, flag, best_move)
+        if not ply:
+            self._root_move = best_move
+        return best_value
+
+
+if __name__ == '__main__':
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    searcher = AlphaBeta(max_depth=depth, time_limit=None)
+    position = GameState()
+    for opening in sys.argv[2:]:
+        position.apply(int(opening))
+    print("Best move:", searcher.choose_move(position))
+    print(searcher.report())
@@ -0,0 +1,141 @@
+"""
+The user's settings, kept in a small JSON file in their config directory
+"""
+
+__all__ = ["Settings", "settings_path"]
+
+import os
+import json
+from typing import Optional, Tuple, Any, Dict, Callable
+from src.cache import config_directory, write_atomic
+
+Colour = Tuple[int, int, int]
+
+
+def settings_path() -> str:
+    """Returns the file the settings are kept in."""
+    return os.path.join(config_directory(), "settings.json")
+
+
+def _colour(value: Any, /) -> Colour:
+    if len(colour := tuple(value)) != 3 or not all(type(part) is int and 0 <= part <= 255 for part in colour):
+        raise ValueError(value)
+    return colour
+
+
+def _number(low: float, high: float, /) -> Callable[[Any], float]:
+    def validate(value: Any, /) -> float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not low <= value <= high:
+            raise ValueError(value)
+        return value
+    return validate
+
+
+def _of_type(kind: type, /) -> Callable[[Any], Any]:
+    def validate(value: Any, /) -> Any:
+        if type(value) is not kind:
+            raise TypeError(value)
+        return value
+    return validate
+
+
+def _frame_rate(value: Any, /) -> Optional[int]:
+    return None if value is None else _of_type(int)(_number(1, 1000)(value))
+
+
+class Settings:
+    """
+    The settings which are kept between runs. They are loaded once when the game starts, and
+    written to the settings file (replacing it atomically) whenever update changes one of them.
+    Settings missing from the file, or which are not valid, take their default values.
+
+    Attributes
+    ----------
+    highlight : tuple[int, int, int]
+        the colour of highlighted text and sprites
+    target_fps : int | None
+        the number of frames per second animations run at, or None to run them as fast as possible
+    vsync : bool
+        whether updates of the window are synchronised with the refresh rate of the monitor
+    scale : float
+        the size of the window relative to the size of the game
+    particle_density : float
+        the number of noughts and crosses falling behind the menus, relative to the default
+    host : str
+        the address games are hosted on and joined at
+    port : int
+        the port games are hosted on and joined at
+    path : str | None
+        the file the settings are written to, or None to not write them
+    """
+
+    __slots__ = "highlight", "target_fps", "vsync", "scale", "particle_density", "host", "port", "path"
+
+    DEFAULTS: Dict[str, Any] = {
+        "highlight": (255, 0, 0),
+        "target_fps": 60,
+        "vsync": False,
+        "scale": 1.0,
+        "particle_density": 1.0,
+        "host": "127.0.0.1",
+        "port": 65432,
+    }
+    # converts each setting read from the file into its value, raising TypeError or ValueError if it is not valid
+    VALIDATORS: Dict[str, Callable[[Any], Any]] = {
+        "highlight": _colour,
+        "target_fps": _frame_rate,
+        "vsync": _of_type(bool),
+        "scale": _number(0.25, 8),
+        "particle_density": _number(0, 20),
+        "host": _of_type(str),
+        "port": lambda value: _of_type(int)(_number(1, 65535)(value)),
+    }
+
+    def __init__(self, path: Optional[str] = None, **values: Any):
+        self.path = path
+        for name, default in self.DEFAULTS.items():
+            setattr(self, name, values.get(name, default))
+
+    def __repr__(self):
+        return f"Settings({', '.join(f'{name}={value!r}' for name, value in self.as_dict().items())})"
+
+    def __eq__(self, other):
+        return isinstance(other, Settings) and self.as_dict() == other.as_dict()
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, /) -> "Settings":
+        """Reads the settings from path (the settings file by default), which need not exist."""
+        path = settings_path() if path is None else path
+        try:
+            with open(path, "rb") as file:
+                stored = json.loads(file.read())
+        except (OSError, ValueError):
+            stored = {}
+        values = {}
+        for name, validate in cls.VALIDATORS.items():
+            if isinstance(stored, dict) and name in stored:
+                try:
+                    values[name] = validate(stored[name])
+                except (TypeError, ValueError):
+                    pass
+        return cls(path, **values)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.DEFAULTS}
+
+    def save(self) -> bool:
+        """Writes the settings to their file and returns whether they could be written."""
+        if self.path is None:
+            return False
+        return write_atomic(self.path, json.dumps(self.as_dict(), indent=2).encode())
+
+    def update(self, **changes: Any) -> bool:
+        """Changes some of the settings, and writes them if any have changed. Returns whether they were written."""
+        changed = False
+        for name, value in changes.items():
+            if name not in self.DEFAULTS:
+                raise AttributeError(f"there is no setting called {name!r}")
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed = True
+        return changed and self.save()
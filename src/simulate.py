@@ -0,0 +1,130 @@
+"""
+Plays many games at once in lockstep with NumPy, for statistics, playout evaluation and training data
+"""
+
+__all__ = ["simulate", "SimulationResult", "LINES"]
+
+import sys
+import time
+from typing import Optional, Callable, NamedTuple
+import numpy as np
+from src.board import WIN_COMBINATIONS
+from src.state import GameState, ONGOING, DRAWN
+
+# the cells (y * 3 + x) of each line of WIN_COMBINATIONS, shape (8, 3)
+LINES = np.array([[y * 3 + x for y, x in combination] for combination in WIN_COMBINATIONS], dtype=np.intp)
+# lookup tables over every 9-bit mask of a 3x3 grid: whether it contains a complete line,
+# how many bits are set, and the positions of its set bits (padded with zeroes)
+_MASKS = np.arange(512)
+_BIT_SET = (_MASKS[:, None] >> np.arange(9)) & 1
+_WINNING = np.zeros(512, dtype=bool)
+for _line in LINES:
+    _WINNING |= _BIT_SET[:, _line].all(axis=1)
+_POPCOUNT = _BIT_SET.sum(axis=1)
+_SET_BITS = np.zeros((512, 9), dtype=np.intp)
+for _mask in range(512):
+    _SET_BITS[_mask, :_POPCOUNT[_mask]] = np.flatnonzero(_BIT_SET[_mask])
+_SUBS = np.arange(9)
+FULL = 0x1FF
+
+# given the cells (0 for empty, 1 for X and 2 for O), the legal moves and the player to move (1 or 2),
+# returns a non-negative weight for every cell, of shape (N, 81)
+Policy = Callable[[np.ndarray, np.ndarray, int], np.ndarray]
+
+
+class SimulationResult(NamedTuple):
+    outcomes: np.ndarray  # X_WON, O_WON or DRAWN for each game
+    move_counts: np.ndarray  # the number of moves played in each game
+
+
+def simulate(games: int, /, *, start: Optional[GameState] = None, policy: Optional[Policy] = None,
+             rng: Optional[np.random.Generator] = None) -> SimulationResult:
+    """
+    Plays games from start (an empty board by default) to the end, all at once.
+    Moves are chosen uniformly at random among the legal moves, or in proportion to the weights
+    given by policy (uniformly in the games where it gives none of the legal moves any weight).
+    Each game is stored like a Board: a 9-bit mask per player and sub-board, so legal moves
+    and wins are found with lookup tables over those masks.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    start = GameState() if start is None else start
+    board = start.board
+    outcomes = np.full(games, start.status(), dtype=np.int8)
+    move_counts = np.zeros(games, dtype=np.int16)
+    # the arrays below only hold the games still being played, which are games[ids]
+    ids = np.flatnonzero(outcomes == ONGOING)
+    marks = np.tile(np.array([[board.sub_cells(sub, player) for sub in range(9)] for player in range(2)],
+                             dtype=np.int16)[:, None], (1, ids.size, 1))
+    # the empty cells of each sub-board, cleared once it is won or drawn
+    empty = np.tile(np.array([0 if board.played() >> sub & 1 else ~(board.occupied() >> sub * 9) & FULL
+                              for sub in range(9)], dtype=np.int16), (ids.size, 1))
+    won = np.tile(np.array(board.won, dtype=np.int16)[:, None], (1, ids.size))
+    played = np.full(ids.size, board.played(), dtype=np.int16)
+    target = np.full(ids.size, -1 if start.target is None else start.target, dtype=np.intp)
+    player, moves = start.to_move, 0
+
+    while ids.size:
+        moves += 1
+        rows = np.arange(ids.size)
+        if policy is None:
+            sub, inner = target.copy(), np.empty(ids.size, dtype=np.intp)
+            # most games must play in one sub-board, where a move is a random set bit of its empty cells
+            forced = np.flatnonzero(target >= 0)
+            cells = empty[forced, sub[forced]]
+            inner[forced] = _SET_BITS[cells, (rng.random(forced.size) * _POPCOUNT[cells]).astype(np.intp)]
+            # the rest choose a random empty cell of all the open sub-boards
+            if (free := np.flatnonzero(target < 0)).size:
+                cells = empty[free]
+                counts = _POPCOUNT[cells]
+                totals = counts.cumsum(axis=1)
+                choice = (rng.random(free.size) * totals[:, -1]).astype(np.intp)
+                free_rows = np.arange(free.size)
+                sub[free] = free_sub = (totals > choice[:, None]).argmax(axis=1)
+                inner[free] = _SET_BITS[cells[free_rows, free_sub],
+                                        choice - totals[free_rows, free_sub] + counts[free_rows, free_sub]]
+        else:
+            cells = empty.copy()
+            forced = target >= 0
+            cells[forced] &= np.where(_SUBS == target[forced, None], FULL, 0)
+            legal = _BIT_SET[cells].reshape(ids.size, 81).astype(bool)
+            board_cells = (_BIT_SET[marks[0]] + 2 * _BIT_SET[marks[1]]).reshape(ids.size, 81)
+            # an exponential race chooses each legal move with probability proportional to its weight
+            race = rng.exponential(size=legal.shape)
+            with np.errstate(divide='ignore'):
+                race /= policy(board_cells.astype(np.int8), legal, player + 1)
+            race[~legal] = np.inf
+            # games where the policy gives every legal move zero weight choose one uniformly instead
+            if (stuck := np.isinf(race.min(axis=1))).any():
+                race[stuck] = np.where(legal[stuck], rng.exponential(size=(np.count_nonzero(stuck), 81)), np.inf)
+            sub, inner = np.divmod(race.argmin(axis=1), 9)
+
+        bit = (1 << inner).astype(np.int16)
+        mine = marks[player, rows, sub] | bit
+        marks[player, rows, sub] = mine
+        won_sub = _WINNING[mine]
+        remaining = np.where(won_sub, 0, empty[rows, sub] & ~bit)
+        empty[rows, sub] = remaining
+        won[player, won_sub] |= (1 << sub[won_sub]).astype(np.int16)
+        played |= (remaining == 0).astype(np.int16) << sub.astype(np.int16)
+        won_game = won_sub & _WINNING[won[player]]
+        drawn = ~won_game & (played == FULL)
+        target = np.where((played >> sub | played >> inner) & 1, -1, inner)
+        player ^= 1
+        if (finished := won_game | drawn).any():
+            outcomes[ids[won_game]] = player ^ 1
+            outcomes[ids[drawn]] = DRAWN
+            move_counts[ids[finished]] = moves
+            playing = ~finished
+            ids, marks, empty, won = ids[playing], marks[:, playing], empty[playing], won[:, playing]
+            played, target = played[playing], target[playing]
+
+    return SimulationResult(outcomes, move_counts)
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    began = time.perf_counter()
+    result = simulate(count)
+    elapsed = time.perf_counter() - began
+    print(f"{count} games in {elapsed:.2f}s ({count / elapsed:.0f}/s), {result.move_counts.mean():.1f} moves on average")
+    print("X wins: {}, O wins: {}, draws: {}".format(*np.bincount(result.outcomes, minlength=3)))
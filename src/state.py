@@ -0,0 +1,160 @@
+"""
+The rules of the game, independent of pygame, used by the GUI, the network code and computer players
+"""
+
+__all__ = ["GameState", "IllegalMoveError", "ONGOING", "X_WON", "O_WON", "DRAWN", "zobrist_hash"]
+
+import random
+from typing import Optional, List
+from src.board import Board, PLAYERS, FULL_MASK
+
+# values returned by GameState.status; X_WON and O_WON are the indices of the winners in PLAYERS
+ONGOING, X_WON, O_WON, DRAWN = -1, 0, 1, 2
+# an entry of GameState.history packs the move (7 bits), the flags returned by Board.place (4 bits)
+# and the target the move was made under, plus one so that None is 0 (4 bits)
+_FLAGS_SHIFT, _TARGET_SHIFT = 7, 11
+
+# Zobrist keys, seeded so that every process (and every saved game) agrees on the hash of a position
+_random = random.Random(0x5EED)
+CELL_KEYS = tuple(tuple(_random.getrandbits(64) for _ in range(81)) for _ in PLAYERS)
+# the last key is for no target, so the target fields of history records (target + 1) index it with - 1
+TARGET_KEYS = tuple(_random.getrandbits(64) for _ in range(10))
+SIDE_KEY = _random.getrandbits(64)  # present when it is O's turn
+del _random
+
+
+def zobrist_hash(board: Board, to_move: int, target: Optional[int], /) -> int:
+    """Computes the 64-bit hash of a position from scratch. GameState keeps its hash up to date incrementally."""
+    hash_ = TARGET_KEYS[9 if target is None else target] ^ (SIDE_KEY if to_move else 0)
+    for player, cells in enumerate(board.cells):
+        for cell in range(81):
+            if cells >> cell & 1:
+                hash_ ^= CELL_KEYS[player][cell]
+    return hash_
+
+
+class IllegalMoveError(ValueError):
+    """Raised when a move breaks the rules. The message is suitable for showing to the player."""
+
+
+class GameState:
+    """
+    A game in progress. Moves are cell indices (0-80) as returned by src.board.cell_index.
+
+    Attributes
+    ----------
+    board : Board
+        the marks on the board and the sub-boards that have been played
+    to_move : int
+        the index in PLAYERS of the player whose turn it is
+    target : int | None
+        the sub-board the next move must be played in, or None if it can be played anywhere
+    history : list[int]
+        an undo record for every move made, holding everything needed to take it back
+    hash : int
+        the Zobrist hash of the position, covering the cells, the player to move and the target
+    """
+
+    __slots__ = "board", "to_move", "target", "history", "hash"
+
+    def __init__(self):
+        self.board = Board()
+        self.to_move = 0
+        self.target: Optional[int] = None
+        self.history: List[int] = []
+        self.hash = zobrist_hash(self.board, self.to_move, self.target)
+
+    def __repr__(self):
+        return f"GameState(to_move={self.player!r}, target={self.target}, moves={len(self.history)})"
+
+    def __copy__(self):
+        """Returns an independent copy of the game."""
+        state = GameState.__new__(GameState)
+        state.board = Board.__new__(Board)
+        state.restore(self.snapshot())
+        return state
+
+    def __deepcopy__(self, memo: dict):
+        return self.__copy__()
+
+    @property
+    def moves(self) -> List[int]:
+        """Every move made so far, in order."""
+        return [record & 0x7F for record in self.history]
+
+    @property
+    def player(self) -> str:
+        """The player whose turn it is, 'X' or 'O'."""
+        return PLAYERS[self.to_move]
+
+    def status(self) -> int:
+        """Returns ONGOING, X_WON, O_WON or DRAWN."""
+        if self.board.winner is not None:
+            return self.board.winner
+        if self.board.played() == FULL_MASK:
+            return DRAWN
+        return ONGOING
+
+    def legal_moves(self) -> List[int]:
+        """Returns every move the player to move can make."""
+        if self.status() != ONGOING:
+            return []
+        occupied, played = self.board.occupied(), self.board.played()
+        subs = range(9) if self.target is None else (self.target,)
+        return [cell for sub in subs if not played >> sub & 1
+                for cell in range(sub * 9, sub * 9 + 9) if not occupied >> cell & 1]
+
+    def validate(self, move: int, /):
+        """Raises IllegalMoveError if move cannot be made."""
+        if not 0 <= move < 81:
+            raise IllegalMoveError("This square is not on the board")
+        if self.status() != ONGOING:
+            raise IllegalMoveError("The game is over")
+        if self.board.occupied() >> move & 1:
+            raise IllegalMoveError("This square is already taken")
+        sub = move // 9
+        if self.board.played() >> sub & 1:
+            raise IllegalMoveError("This grid has already been played")
+        if self.target is not None and sub != self.target:
+            raise IllegalMoveError("You cannot play in this square")
+
+    def apply(self, move: int, /) -> int:
+        """
+        Makes a move for the player to move and passes the turn to the other player.
+        The next move must be played in the sub-board matching the cell played in, unless that
+        sub-board (or the one just played in) has been won or drawn.
+        Returns the flags from Board.place.
+        """
+        self.validate(move)
+        flags = self.board.place(move, self.to_move)
+        target = 0 if self.target is None else self.target + 1
+        self.history.append(move | flags << _FLAGS_SHIFT | target << _TARGET_SHIFT)
+        sub, inner = divmod(move, 9)
+        played = self.board.played()
+        self.target = inner if not played >> sub & 1 and not played >> inner & 1 else None
+        self.hash ^= (CELL_KEYS[self.to_move][move] ^ SIDE_KEY ^ TARGET_KEYS[target - 1]
+                      ^ TARGET_KEYS[9 if self.target is None else self.target])
+        self.to_move ^= 1
+        return flags
+
+    def undo(self) -> int:
+        """Takes back the last move and returns it."""
+        record = self.history.pop()
+        move = record & 0x7F
+        self.to_move ^= 1
+        self.board.unplace(move, self.to_move, record >> _FLAGS_SHIFT & 0xF)
+        self.hash ^= CELL_KEYS[self.to_move][move] ^ SIDE_KEY ^ TARGET_KEYS[9 if self.target is None else self.target]
+        target = record >> _TARGET_SHIFT
+        self.target = None if target == 0 else target - 1
+        self.hash ^= TARGET_KEYS[target - 1]
+        return move
+
+    def snapshot(self) -> tuple:
+        """Returns the whole state of the game, to be passed to restore. Much cheaper than copying the game."""
+        return self.board.snapshot(), self.to_move, self.target, tuple(self.history), self.hash
+
+    def restore(self, snapshot: tuple, /):
+        """Returns the game to the state it was in when snapshot was taken."""
+        board, self.to_move, self.target, history, self.hash = snapshot
+        self.board.restore(board)
+        self.history = list(history)
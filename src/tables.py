@@ -0,0 +1,100 @@
+"""
+Lookup tables over every possible 3x3 grid, built once and cached on disk
+"""
+
+__all__ = ["WIN_COMBINATIONS", "LINE_MASKS", "FULL_MASK", "STATES", "POWERS", "TERNARY", "OPEN", "NO_TRANSITION",
+           "STATUS", "TRANSITIONS", "encode", "transition", "build_tables", "load_tables"]
+
+import sys
+import hashlib
+from array import array
+from typing import Tuple
+from src.cache import read_cache, write_cache
+
+FULL_MASK = 0x1FF  # all nine cells of a 3x3 grid
+WIN_COMBINATIONS = [
+    ((0, 0), (0, 1), (0, 2)),
+    ((0, 0), (1, 0), (2, 0)),
+    ((1, 0), (1, 1), (1, 2)),
+    ((0, 1), (1, 1), (2, 1)),
+    ((2, 0), (2, 1), (2, 2)),
+    ((0, 2), (1, 2), (2, 2)),
+    ((0, 0), (1, 1), (2, 2)),
+    ((0, 2), (1, 1), (2, 0))
+]
+# WIN_COMBINATIONS as 9-bit masks, where (y, x) is bit y * 3 + x
+LINE_MASKS = tuple(sum(1 << (y * 3 + x) for y, x in combination) for combination in WIN_COMBINATIONS)
+
+# a grid is encoded in base 3, where cell i (y * 3 + x) is digit i: 0 if empty, 1 for X and 2 for O
+STATES = 3 ** 9
+POWERS = tuple(3 ** cell for cell in range(9))
+# the encoding of every 9-bit mask of cells held by X; a mask held by O encodes to twice this
+TERNARY = tuple(sum(POWERS[cell] for cell in range(9) if mask >> cell & 1) for mask in range(512))
+# the status of a grid is X_WON (0), O_WON (1) or DRAWN (2) like GameState.status, or OPEN if it can still be won.
+# Grids where both players have a line cannot be reached in a game and count as won by X
+OPEN = 3
+NO_TRANSITION = 0xFFFF  # the transition to a cell which is already occupied
+_CACHE_NAME = "subboards-v1.bin"
+_MAGIC = b"RNC3"
+
+
+def encode(x_cells: int, o_cells: int, /) -> int:
+    """Returns the encoding of a grid from the 9-bit masks of the cells each player occupies."""
+    return TERNARY[x_cells] + 2 * TERNARY[o_cells]
+
+
+def transition(state: int, player: int, cell: int, /) -> int:
+    """Returns the encoding of a grid after player (0 or 1) occupies cell, using TRANSITIONS."""
+    return TRANSITIONS[(state * 2 + player) * 9 + cell]
+
+
+def build_tables() -> Tuple[bytes, array]:
+    """
+    Computes STATUS, the status of every grid, and TRANSITIONS, the grid reached when either
+    player occupies each cell of each grid, at (state * 2 + player) * 9 + cell.
+    """
+    status = bytearray(STATES)
+    transitions = array("H", [NO_TRANSITION]) * (STATES * 18)
+    for state in range(STATES):
+        digits, remaining = [0] * 9, state
+        for cell in range(9):
+            remaining, digits[cell] = divmod(remaining, 3)
+        x_cells = sum(1 << cell for cell in range(9) if digits[cell] == 1)
+        o_cells = sum(1 << cell for cell in range(9) if digits[cell] == 2)
+        if any(x_cells & line == line for line in LINE_MASKS):
+            status[state] = 0
+        elif any(o_cells & line == line for line in LINE_MASKS):
+            status[state] = 1
+        else:
+            status[state] = 2 if x_cells | o_cells == FULL_MASK else OPEN
+        for cell in range(9):
+            if not digits[cell]:
+                transitions[state * 18 + cell] = state + POWERS[cell]
+                transitions[state * 18 + 9 + cell] = state + 2 * POWERS[cell]
+    return bytes(status), transitions
+
+
+def load_tables() -> Tuple[bytes, array]:
+    """
+    Returns the tables from the cache, building and caching them if they are missing or damaged.
+    The cached file holds a digest of the tables after a magic number, and its integers are little-endian.
+    """
+    data = read_cache(_CACHE_NAME)
+    if data is not None and data[:4] == _MAGIC and len(data) == 36 + STATES * 37:
+        payload = data[36:]
+        if hashlib.sha256(payload).digest() == data[4:36]:
+            transitions = array("H")
+            transitions.frombytes(payload[STATES:])
+            if sys.byteorder == "big":
+                transitions.byteswap()
+            return payload[:STATES], transitions
+    status, transitions = build_tables()
+    little_endian = array("H", transitions)
+    if sys.byteorder == "big":
+        little_endian.byteswap()
+    payload = status + little_endian.tobytes()
+    write_cache(_CACHE_NAME, _MAGIC + hashlib.sha256(payload).digest() + payload)
+    return status, transitions
+
+
+STATUS, TRANSITIONS = load_tables()
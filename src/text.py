@@ -0,0 +1,76 @@
+"""
+Caches of opened fonts and rendered text, so that static labels are only rasterised once
+"""
+
+__all__ = ["TextCache"]
+
+from collections import OrderedDict
+from typing import Optional, Tuple, Dict
+import pygame
+
+Colour = Tuple[int, int, int]
+
+
+class TextCache:
+    """
+    Opens each font once per (name, size), and keeps the most recently used rendered text
+    surfaces keyed by (name, text, size, colour), evicting the least recently used.
+    The surfaces are shared, so they must be blitted rather than drawn on.
+
+    Attributes
+    ----------
+    max_size : int
+        the number of rendered text surfaces to keep
+    fonts : dict[tuple[str | None, int], pygame.font.Font]
+        every font opened so far
+    hits : int
+        the number of renders served from the cache
+    misses : int
+        the number of renders which had to be rasterised
+    """
+
+    __slots__ = "max_size", "fonts", "surfaces", "hits", "misses"
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self.fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+        self.surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self) -> str:
+        """Returns the statistics of the cache."""
+        return (f"{len(self.surfaces)} texts and {len(self.fonts)} fonts cached, "
+                f"{self.hits} hits and {self.misses} misses ({self.hit_rate:.1%})")
+
+    def clear(self):
+        """Forgets every font and surface, e.g. after pygame has been quit and initialised again."""
+        self.fonts.clear()
+        self.surfaces.clear()
+        self.hits = self.misses = 0
+
+    def font(self, name: Optional[str], size: int, /) -> pygame.font.Font:
+        """Returns the font with name (a path, or None for the default font) at size, opening it the first time."""
+        if (font := self.fonts.get(key := (name, size))) is None:
+            font = self.fonts[key] = pygame.font.Font(name, size)
+        return font
+
+    def render(self, name: Optional[str], text: str, size: int, colour: Colour, /) -> pygame.Surface:
+        """Returns text rendered (antialiased) in the font with name at size."""
+        key = name, text, size, tuple(colour)
+        if (surface := self.surfaces.get(key)) is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.surfaces[key] = self.font(name, size).render(text, True, colour)
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
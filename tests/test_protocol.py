@@ -0,0 +1,137 @@
+"""
+Tests of the framing of online games' messages (src.protocol). Run from the repository's root with
+python -m unittest or python -m pytest
+"""
+
+import struct
+import unittest
+from src.protocol import (VERSION, MOVE, RESIGN, PING, PONG, STATE_SYNC, Message, ProtocolError, FrameDecoder,
+                          encode, encode_move, encode_resign, encode_ping, encode_pong, encode_state)
+
+STREAM = [
+    (encode_state(bytes((40, 36, 4))), Message(STATE_SYNC, bytes((40, 36, 4)))),
+    (encode_move(0), Message(MOVE, 0)),
+    (encode_ping(0xFFFFFFFF), Message(PING, 0xFFFFFFFF)),
+    (encode_state(b""), Message(STATE_SYNC, b"")),
+    (encode_move(80), Message(MOVE, 80)),
+    (encode_pong(7), Message(PONG, 7)),
+    (encode_resign(), Message(RESIGN)),
+]
+DATA = b"".join(frame for frame, _ in STREAM)
+MESSAGES = [message for _, message in STREAM]
+
+
+def header(length: int, version: int, kind: int) -> bytes:
+    return struct.pack("!HBB", length, version, kind)
+
+
+class TestEncode(unittest.TestCase):
+
+    def test_move_frame(self):
+        self.assertEqual(encode_move(40), bytes((0, 3, VERSION, MOVE, 40)))
+
+    def test_resign_frame_has_no_payload(self):
+        self.assertEqual(encode_resign(), bytes((0, 2, VERSION, RESIGN)))
+
+    def test_ping_nonce_is_big_endian(self):
+        self.assertEqual(encode_ping(0x01020304), bytes((0, 6, VERSION, PING, 1, 2, 3, 4)))
+
+    def test_largest_payload(self):
+        self.assertEqual(FrameDecoder().feed(encode_state(bytes(0xFFFD))), [Message(STATE_SYNC, bytes(0xFFFD))])
+
+    def test_payload_too_large(self):
+        with self.assertRaises(ValueError):
+            encode(STATE_SYNC, bytes(0xFFFE))
+
+
+class TestFrameDecoder(unittest.TestCase):
+
+    def test_coalesced(self):
+        decoder = FrameDecoder()
+        self.assertEqual(decoder.feed(DATA), MESSAGES)
+        self.assertEqual(decoder.buffer, b"")
+
+    def test_one_byte_at_a_time(self):
+        decoder = FrameDecoder()
+        messages = []
+        for offset in range(len(DATA)):
+            messages += decoder.feed(DATA[offset:offset + 1])
+        self.assertEqual(messages, MESSAGES)
+        self.assertEqual(decoder.buffer, b"")
+
+    def test_every_split(self):
+        for split in range(len(DATA) + 1):
+            with self.subTest(split=split):
+                decoder = FrameDecoder()
+                self.assertEqual(decoder.feed(DATA[:split]) + decoder.feed(DATA[split:]), MESSAGES)
+
+    def test_segments_across_frame_boundaries(self):
+        decoder = FrameDecoder()
+        messages = []
+        for offset in range(0, len(DATA), 5):
+            messages += decoder.feed(memoryview(DATA)[offset:offset + 5])
+        self.assertEqual(messages, MESSAGES)
+
+    def test_incomplete_frame_waits(self):
+        decoder = FrameDecoder()
+        self.assertEqual(decoder.feed(encode_move(40) + encode_ping(1)[:5]), [Message(MOVE, 40)])
+        self.assertEqual(bytes(decoder.buffer), encode_ping(1)[:5])
+        self.assertEqual(decoder.feed(encode_ping(1)[5:]), [Message(PING, 1)])
+
+    def test_partial_header_waits(self):
+        decoder = FrameDecoder()
+        self.assertEqual(decoder.feed(b"\x00"), [])
+        self.assertEqual(decoder.feed(b"\x03" + bytes((VERSION, MOVE))), [])
+        self.assertEqual(decoder.feed(b"\x28"), [Message(MOVE, 40)])
+
+    def test_empty_feed(self):
+        self.assertEqual(FrameDecoder().feed(b""), [])
+
+
+class TestInvalidFrames(unittest.TestCase):
+
+    def assertRejected(self, data: bytes, message: str, /):
+        with self.assertRaisesRegex(ProtocolError, message):
+            FrameDecoder().feed(data)
+
+    def test_other_version(self):
+        self.assertRejected(header(3, VERSION + 1, MOVE) + b"\x00", "version")
+
+    def test_other_version_is_rejected_before_its_payload_arrives(self):
+        self.assertRejected(header(0xFFFF, 0, MOVE), "version")
+
+    def test_legacy_text_is_rejected(self):
+        self.assertRejected(b"(1, 1, 1, 1)", "version")
+
+    def test_length_too_short_for_header(self):
+        for length in (0, 1):
+            with self.subTest(length=length):
+                self.assertRejected(header(length, VERSION, MOVE), "too short")
+
+    def test_unknown_type(self):
+        self.assertRejected(header(2, VERSION, 0), "unknown type")
+        self.assertRejected(header(2, VERSION, 99), "unknown type")
+
+    def test_wrong_payload_sizes(self):
+        for kind, size in ((MOVE, 0), (MOVE, 2), (RESIGN, 1), (PING, 3), (PONG, 5)):
+            with self.subTest(kind=kind, size=size):
+                self.assertRejected(header(2 + size, VERSION, kind) + bytes(size), "bytes of payload")
+
+    def test_cell_off_the_board(self):
+        self.assertRejected(header(3, VERSION, MOVE) + b"\x51", "not a cell")
+
+    def test_valid_frames_before_an_invalid_one_are_not_returned(self):
+        decoder = FrameDecoder()
+        with self.assertRaises(ProtocolError):
+            decoder.feed(encode_move(40) + header(3, VERSION, MOVE) + b"\xFF")
+
+    def test_invalid_frame_split_across_feeds(self):
+        decoder = FrameDecoder()
+        data = encode_move(40) + header(3, VERSION, MOVE) + b"\x51"
+        self.assertEqual(decoder.feed(data[:-1]), [Message(MOVE, 40)])
+        with self.assertRaises(ProtocolError):
+            decoder.feed(data[-1:])
+
+
+if __name__ == '__main__':
+    unittest.main()